@@ -0,0 +1,154 @@
+"""Headless batch rendering of every chart the apps can show.
+
+Renders population trends per country, life-expectancy rankings per year and
+the AQI ranking to image files without Tk, e.g.
+
+    python batch_report.py --out reports --format png --workers 4
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from dataset_cache import load_csv
+from registry import require_dataset
+from worldbank import load_wide
+
+# One figure per worker process, cleared and reused for every chart
+_figure = None
+_data = {}
+
+
+def init_worker(paths):
+    """Load the datasets once per worker and create its figure."""
+    global _figure
+    _figure = Figure(figsize=(10, 6))
+    FigureCanvasAgg(_figure)
+    _data["paths"] = paths
+
+
+def population_table():
+    if "population" not in _data:
+        _data["population"] = load_wide(_data["paths"]["population"])
+    return _data["population"]
+
+
+def life_frame():
+    if "life" not in _data:
+        df = load_csv(_data["paths"]["life"])
+        df.columns = df.columns.str.strip()
+        _data["life"] = df
+    return _data["life"]
+
+
+def pollution_averages():
+    if "pollution" not in _data:
+        from pollution_analysis import aggregate_files, streamed_country_averages
+        _data["pollution"] = streamed_country_averages(aggregate_files([_data["paths"]["pollution"]]))
+    return _data["pollution"]
+
+
+def safe_filename(name):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(name)).strip("_") or "unnamed"
+
+
+def render_population(ax, country):
+    years, values = population_table().series(country)
+    ax.plot(years, values, marker='o', color='blue')
+    ax.set_title(f"Population over Years: {country}")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Population (units as per data)")
+    ax.grid(True)
+
+
+def render_life_ranking(ax, year):
+    df = life_frame()
+    data = df[df["Year"] == year].sort_values("Life expectancy", ascending=True)
+    _figure.set_size_inches(10, max(6, len(data) * 0.25))
+    ax.barh(data["Country"], data["Life expectancy"])
+    ax.set_title(f"Life Expectancy by Country ({year})")
+    ax.tick_params(axis='y', labelsize=7)
+
+
+def render_aqi_ranking(ax, _):
+    data = pollution_averages()
+    _figure.set_size_inches(14, max(7, len(data) * 0.2))
+    ax.barh(data["Country"], data["Average_AQI"])
+    ax.set_xlabel("Average AQI")
+    ax.set_title("Average AQI by Country (Cleanest → Dirtiest)")
+    ax.tick_params(axis='y', labelsize=7)
+
+
+RENDERERS = {
+    "population": render_population,
+    "life": render_life_ranking,
+    "aqi": render_aqi_ranking,
+}
+
+
+def render_chart(task):
+    """Draw one chart on the worker's figure and save it. Runs in a worker."""
+    kind, key, path = task
+    _figure.clear()
+    _figure.set_size_inches(10, 6)
+    ax = _figure.add_subplot()
+    RENDERERS[kind](ax, key)
+    _figure.tight_layout()
+    _figure.savefig(path)
+    return path
+
+
+def plan_tasks(paths, out_dir, fmt, kinds):
+    """One (kind, key, output path) task per chart."""
+    tasks = []
+    if "population" in kinds:
+        os.makedirs(os.path.join(out_dir, "population"), exist_ok=True)
+        for country in dict.fromkeys(load_wide(paths["population"]).countries):
+            tasks.append(("population", country,
+                          os.path.join(out_dir, "population", f"{safe_filename(country)}.{fmt}")))
+    if "life" in kinds:
+        os.makedirs(os.path.join(out_dir, "life"), exist_ok=True)
+        for year in sorted(load_csv(paths["life"])["Year"].unique().tolist()):
+            tasks.append(("life", year, os.path.join(out_dir, "life", f"{year}.{fmt}")))
+    if "aqi" in kinds:
+        tasks.append(("aqi", None, os.path.join(out_dir, f"aqi_ranking.{fmt}")))
+    return tasks
+
+
+def run_report(out_dir, fmt="png", workers=None, kinds=tuple(RENDERERS)):
+    paths = {
+        "population": require_dataset("population.csv"),
+        "life": require_dataset("life.csv"),
+        "pollution": require_dataset("pollution.csv"),
+    }
+    tasks = plan_tasks(paths, out_dir, fmt, kinds)
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(paths,)) as pool:
+        # Chunks keep per-task overhead low when there are hundreds of small charts
+        for _ in pool.map(render_chart, tasks, chunksize=max(1, len(tasks) // (workers * 4))):
+            pass
+    elapsed = time.perf_counter() - start
+
+    print(f"Rendered {len(tasks)} charts to {out_dir} in {elapsed:.1f} s "
+          f"with {workers} workers ({len(tasks) / elapsed:.1f} charts/s)")
+    return len(tasks), elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render every chart to image files without a display.")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--format", default="png", choices=["png", "svg", "pdf"])
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--only", nargs="+", choices=list(RENDERERS), default=list(RENDERERS),
+                        help="chart kinds to render")
+    args = parser.parse_args()
+
+    run_report(args.out, args.format, args.workers, args.only)
@@ -0,0 +1,446 @@
+"""Scaled benchmarks for the data paths behind each app.
+
+Synthetic copies of population.csv (wide years), life.csv (long country/year
+panel) and pollution.csv (city rows) are generated at several multiples of the
+bundled sizes, then the code each window runs is timed against them, e.g.
+
+    python benchmark.py                          # 1x, 10x and 100x, compared with the baselines
+    python benchmark.py --scales 1 10 100 1000
+    python benchmark.py --save-baseline          # record these results as the new baselines
+
+Loads are timed warm, reading the binary cache, and as ``*_cold`` variants
+that clear the cache before every run, so the CSV parse and cache write are
+timed too. A short calibration loop is timed alongside the suite and
+stored with the baselines; comparisons scale the baselines by how much faster
+or slower this machine runs it, so baselines recorded elsewhere stay usable.
+
+Tk widgets are replaced by small stand-ins so the suite runs without a
+display; only display_dataset needs a real Tk root and is skipped without one.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.environ.get("BENCH_DIR", os.path.join(tempfile.gettempdir(), "country-data-bench"))
+BASELINE_PATH = os.path.join(REPO_DIR, "benchmark_baselines.json")
+
+# Keep the synthetic files' binary caches out of the repo's .datacache, and out of
+# any DATA_CACHE_DIR the user has set: the *_cold benchmarks delete this directory
+os.environ["DATA_CACHE_DIR"] = os.path.join(BENCH_DIR, "cache")
+
+import matplotlib
+matplotlib.use("Agg")
+
+SCALES = [1, 10, 100, 1000]
+DEFAULT_SCALES = [1, 10, 100]
+REPEAT = 3
+# A result this many times slower than its baseline is reported as a regression...
+REGRESSION_FACTOR = 1.5
+# ...unless the difference is below timer noise
+MIN_REGRESSION_SECONDS = 0.005
+
+# Bundled file -> columns made unique in each extra copy
+SOURCES = {
+    "population.csv": ["country_name", "country_code"],
+    "life.csv": ["Country"],
+    "pollution.csv": ["City"],
+}
+# Files whose headers are compared by compare_datasets, once per scale step
+SCHEMA_SOURCES = ["population.csv", "internet.csv", "life.csv", "pollution.csv"]
+# Keystrokes replayed into the country search box
+TYPED_QUERIES = ["u", "un", "uni", "unit", "unite", "united", "unite", "unit", "uni", "un", "u", "", "ger", "a"]
+
+
+def generate(scale, out_dir):
+    """Write synthetic datasets at ``scale`` times the bundled sizes; existing files are reused."""
+    import pandas as pd
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    for name, renamed in SOURCES.items():
+        path = os.path.join(out_dir, name)
+        paths[name] = path
+        if os.path.exists(path):
+            continue
+        base = pd.read_csv(os.path.join(REPO_DIR, name))
+        staging = path + ".tmp"
+        with open(staging, "w", newline="", encoding="utf-8") as f:
+            for copy in range(scale):
+                part = base
+                if copy:
+                    # Copy n of "Aruba" is "Aruba 2", so lookups and searches see more names
+                    part = base.copy()
+                    for column in renamed:
+                        part[column] = part[column].astype(str) + f" {copy + 1}"
+                part.to_csv(f, header=copy == 0, index=False)
+        os.replace(staging, path)
+
+    # Header comparison scales with the number of files, not their length
+    schema_dir = os.path.join(out_dir, "schemas")
+    os.makedirs(schema_dir, exist_ok=True)
+    schema_paths = []
+    for copy in range(scale):
+        for name in SCHEMA_SOURCES:
+            path = os.path.join(schema_dir, f"{copy}-{name}")
+            schema_paths.append(path)
+            if not os.path.exists(path):
+                with open(os.path.join(REPO_DIR, name), encoding="utf-8-sig") as src, \
+                        open(path, "w", encoding="utf-8") as dst:
+                    dst.writelines(line for _, line in zip(range(10), src))
+    paths["schemas"] = schema_paths
+    return paths
+
+
+class StandInEntry:
+    def __init__(self, text=""):
+        self.text = text
+        self.master = None
+
+    def get(self):
+        return self.text
+
+    def after(self, ms, fn):
+        # No event loop, so the debounced call runs straight away
+        fn()
+
+    def after_cancel(self, handle):
+        pass
+
+    def focus_get(self):
+        return None
+
+
+class StandInListbox:
+    """Just enough of tk.Listbox to replay inserts and deletes."""
+
+    def __init__(self):
+        self.items = []
+
+    def insert(self, index, *values):
+        index = len(self.items) if index == "end" else index
+        self.items[index:index] = values
+
+    def delete(self, first, last=None):
+        if first == 0 and last == "end":
+            del self.items[:]
+        else:
+            del self.items[first:(first if last is None else last) + 1]
+
+    def place(self, **kwargs):
+        pass
+
+    def place_forget(self):
+        pass
+
+    def lift(self):
+        pass
+
+    def focus_get(self):
+        return None
+
+
+class StandInVar:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+def calibrate(repeat=5):
+    """Best time of a fixed mix of interpreter and NumPy work, as a measure of this machine's speed."""
+    import numpy as np
+    data = np.random.default_rng(0).random(1_000_000)
+
+    def work():
+        total = 0
+        for i in range(300_000):
+            total += i % 7
+        np.sort(data)
+        return total
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        work()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def cold(fn):
+    """``fn`` with the benchmark's binary cache cleared before each timed run (outside the timing)."""
+    import dataset_cache
+    # Never the user's cache, even if dataset_cache was imported before DATA_CACHE_DIR was set
+    if os.path.commonpath([os.path.abspath(dataset_cache.CACHE_DIR), os.path.abspath(BENCH_DIR)]) \
+            != os.path.abspath(BENCH_DIR):
+        raise RuntimeError(f"Refusing to clear {dataset_cache.CACHE_DIR}: not the benchmark's cache")
+    return SimpleNamespace(setup=dataset_cache.clear_cache, run=fn)
+
+
+def bench_read_population_data(paths):
+    from data_downloader import PopulationApp
+    return lambda: PopulationApp.read_population_data(SimpleNamespace(), paths["population.csv"])
+
+
+def bench_read_population_data_cold(paths):
+    return cold(bench_read_population_data(paths))
+
+
+def bench_combo_filter(paths):
+    from data_downloader import PopulationApp, SearchableComboBox
+    countries = PopulationApp.read_population_data(SimpleNamespace(), paths["population.csv"]).countries.tolist()
+
+    def run():
+        combo = SearchableComboBox.__new__(SearchableComboBox)
+        combo.entry, combo.listbox = StandInEntry(), StandInListbox()
+        combo.resolve_alias, combo.pending_filter = None, None
+        combo.on_select_callback = print
+        combo.set_options(countries)
+        for query in TYPED_QUERIES:
+            combo.entry.text = query
+            # on_entry_key debounces to exactly this call
+            combo.on_entry_key(None)
+    return run
+
+
+def load_life(path):
+    from dataset_cache import load_csv
+    from life import YearIndex
+    df = load_csv(path, compact=True)
+    df.columns = df.columns.str.strip()
+    return df, YearIndex(df)
+
+
+def bench_life_load(paths):
+    return lambda: load_life(paths["life.csv"])
+
+
+def bench_life_load_cold(paths):
+    return cold(bench_life_load(paths))
+
+
+def bench_get_filtered_data(paths):
+    from life import life_expectancy_app
+    df, index = load_life(paths["life.csv"])
+    app = SimpleNamespace(df=df, index=index)
+
+    def run():
+        for year in index.rows:
+            for sort_mode in ["Highest to Lowest", "Lowest to Highest"]:
+                life_expectancy_app.get_filtered_data(app, year, sort_mode)
+    return run
+
+
+def bench_update_country_list(paths):
+    from life import life_expectancy_app
+    df, index = load_life(paths["life.csv"])
+    app = SimpleNamespace(df=df, index=index, country_listbox=StandInListbox(),
+                          year_var=StandInVar(), search_var=StandInVar())
+
+    def run():
+        for year in index.rows:
+            app.year_var.value = str(year)
+            for query in TYPED_QUERIES:
+                app.search_var.value = query
+                life_expectancy_app.update_country_list(app)
+    return run
+
+
+def bench_compare_datasets(paths):
+    import schemas
+    from comparedatasets import compare_datasets
+
+    def run():
+        # Time a fresh comparison rather than the in-process header cache
+        schemas._schema_cache.clear()
+        compare_datasets(paths["schemas"])
+    return run
+
+
+def bench_display_dataset(paths):
+    import tkinter as tk
+    from explore import read_dataset, VirtualTable
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        return None
+    root.withdraw()
+
+    def run():
+        window = tk.Toplevel(root)
+        VirtualTable(window, read_dataset(paths["pollution.csv"]))
+        window.update_idletasks()
+        window.destroy()
+    return run
+
+
+def bench_pollution_in_memory(paths):
+    from dataset_cache import load_csv
+    from pollution_analysis import country_averages
+    return lambda: country_averages(load_csv(paths["pollution.csv"], compact=True))
+
+
+def bench_pollution_in_memory_cold(paths):
+    return cold(bench_pollution_in_memory(paths))
+
+
+def bench_pollution_streamed(paths):
+    from pollution_analysis import aggregate_files, streamed_country_averages
+    return lambda: streamed_country_averages(aggregate_files([paths["pollution.csv"]]))
+
+
+BENCHMARKS = {
+    "read_population_data": bench_read_population_data,
+    "read_population_data_cold": bench_read_population_data_cold,
+    "combo_filter": bench_combo_filter,
+    "life_load": bench_life_load,
+    "life_load_cold": bench_life_load_cold,
+    "get_filtered_data": bench_get_filtered_data,
+    "update_country_list": bench_update_country_list,
+    "compare_datasets": bench_compare_datasets,
+    "display_dataset": bench_display_dataset,
+    "pollution_in_memory": bench_pollution_in_memory,
+    "pollution_in_memory_cold": bench_pollution_in_memory_cold,
+    "pollution_streamed": bench_pollution_streamed,
+}
+
+
+def measure(fn, repeat=REPEAT, setup=None):
+    """Best wall time of ``repeat`` runs, then peak traced memory of one more run.
+
+    A warm-up run comes first. Without ``setup`` loads are therefore timed
+    with the binary cache built; ``setup`` runs untimed before every run.
+    """
+    setup = setup or (lambda: None)
+    setup()
+    fn()
+    times = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    setup()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_mb": peak / 2**20}
+
+
+def run_suite(scales, names, repeat=REPEAT):
+    results = {"_calibration": {"seconds": calibrate()}}
+    print(f"Calibration loop: {results['_calibration']['seconds'] * 1000:.1f} ms")
+    for scale in scales:
+        started = time.perf_counter()
+        paths = generate(scale, os.path.join(BENCH_DIR, f"{scale}x"))
+        print(f"\n{scale}x (data ready in {time.perf_counter() - started:.1f} s)")
+        results[f"{scale}x"] = {}
+        for name in names:
+            fn = BENCHMARKS[name](paths)
+            if fn is None:
+                print(f"  {name:26} skipped (no display)")
+                continue
+            if isinstance(fn, SimpleNamespace):
+                result = measure(fn.run, repeat, fn.setup)
+            else:
+                result = measure(fn, repeat)
+            results[f"{scale}x"][name] = result
+            print(f"  {name:26} {result['seconds'] * 1000:10.1f} ms  {result['peak_mb']:9.1f} MB", flush=True)
+    return results
+
+
+def load_baselines(path=BASELINE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baselines(results, path=BASELINE_PATH):
+    baselines = load_baselines(path)
+    # The calibration belongs to the machine the baselines were recorded on
+    baselines["_calibration"] = {"seconds": round(results["_calibration"]["seconds"], 6)}
+    for scale, benchmarks in results.items():
+        if scale.startswith("_"):
+            continue
+        baselines.setdefault(scale, {}).update(
+            {name: {key: round(value, 4) for key, value in result.items()} for name, result in benchmarks.items()}
+        )
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def machine_factor(results, baselines):
+    """How much slower this run's machine is than the baselines' one, from the calibration loops."""
+    here = results.get("_calibration", {}).get("seconds")
+    there = baselines.get("_calibration", {}).get("seconds")
+    return here / there if here and there else 1.0
+
+
+def compare(results, baselines):
+    """Print each result against its baseline and against the 1x run; returns the regressions.
+
+    Baselines are scaled by ``machine_factor`` before comparing.
+    """
+    regressions = []
+    factor = machine_factor(results, baselines)
+    if "_calibration" in baselines:
+        print(f"\nBaselines scaled by {factor:.2f} for this machine's speed")
+    else:
+        print("\nBaselines have no calibration; comparing absolute times")
+    print(f"\n{'scale':>6} {'benchmark':26} {'ms':>10} {'baseline':>10} {'ratio':>7} {'vs 1x':>8}")
+    for scale, benchmarks in results.items():
+        if scale.startswith("_"):
+            continue
+        for name, result in benchmarks.items():
+            seconds = result["seconds"]
+            base = baselines.get(scale, {}).get(name)
+            if base:
+                base = dict(base, seconds=base["seconds"] * factor)
+            one_x = results.get("1x", {}).get(name)
+            if not one_x and baselines.get("1x", {}).get(name):
+                one_x = {"seconds": baselines["1x"][name]["seconds"] * factor}
+
+            base_text = ratio_text = ""
+            flag = ""
+            if base:
+                ratio = seconds / base["seconds"] if base["seconds"] else float("inf")
+                base_text, ratio_text = f"{base['seconds'] * 1000:.1f}", f"{ratio:.2f}"
+                if ratio > REGRESSION_FACTOR and seconds - base["seconds"] > MIN_REGRESSION_SECONDS:
+                    flag = "  REGRESSION"
+                    regressions.append((scale, name, ratio))
+            growth = f"{seconds / one_x['seconds']:.1f}x" if one_x and one_x["seconds"] else ""
+            print(f"{scale:>6} {name:26} {seconds * 1000:10.1f} {base_text:>10} {ratio_text:>7} {growth:>8}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the apps' data paths on scaled synthetic datasets.")
+    parser.add_argument("--scales", type=int, nargs="+", choices=SCALES, default=DEFAULT_SCALES,
+                        help="multiples of the bundled dataset sizes")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baselines")
+    args = parser.parse_args()
+
+    results = run_suite(args.scales, args.only, args.repeat)
+    regressions = compare(results, load_baselines())
+
+    if args.save_baseline:
+        save_baselines(results)
+        print(f"\nBaselines saved to {BASELINE_PATH}")
+    elif regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than {REGRESSION_FACTOR}x their baseline")
+        sys.exit(1)
@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+
+# Rendered charts kept across all windows; a 900x600 chart is about 2 MB
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+
+class ChartCache:
+    """Least-recently-used cache of rendered chart rasters, bounded by size in bytes.
+
+    Keys describe everything that decides what a chart looks like (dataset
+    version, selection, sort, page, canvas size), so a hit can be blitted
+    onto the canvas instead of laying out and rasterizing the figure again.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        with self.lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return
+            self.entries[key] = (value, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted_bytes) = self.entries.popitem(last=False)
+                self.size -= evicted_bytes
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def region_bytes(figure):
+    """Size of an RGBA copy of the whole figure, as made by ``canvas.copy_from_bbox``."""
+    return int(figure.bbox.width) * int(figure.bbox.height) * 4
+
+
+_chart_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_chart_cache():
+    """The cache shared by every chart window."""
+    global _chart_cache
+    with _cache_lock:
+        if _chart_cache is None:
+            _chart_cache = ChartCache()
+        return _chart_cache
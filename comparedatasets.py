@@ -1,7 +1,16 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import pandas as pd
-from itertools import combinations
+from collections import defaultdict
+from jobs import JobStatusBar
+from schemas import sniff_schemas
+from joinability import find_join_keys
+from instrumentation import timed
+
+
+# Two datasets are similar when they share at least this many columns...
+MIN_SHARED_COLUMNS = 2
+# ...and the Jaccard similarity of their column sets is at least this
+MIN_JACCARD = 0.0
 
 
 def open_dataset(parent):
@@ -20,65 +29,170 @@ def open_dataset(parent):
     analyze_datasets(parent, file_paths)
 
 
-def load_dataframe(file):
-    if file.endswith(".csv"):
-        df = pd.read_csv(file)
-    elif file.endswith(".xlsx"):
-        df = pd.read_excel(file)
-    else:
-        return None
-
-    # Normalise column names
-    df.columns = df.columns.str.strip().str.lower()
-    return df
-
+def open_join_finder(parent):
+    file_paths = filedialog.askopenfilenames(
+        title="Select Datasets",
+        filetypes=[("CSV Files", "*.csv"), ("Excel Files", "*.xlsx")]
+    )
 
-def analyze_datasets(parent, file_paths):
-    datasets = {}
+    if len(file_paths) < 2:
+        messagebox.showwarning(
+            "Not enough files",
+            "Please select at least 2 datasets."
+        )
+        return
 
-    for file in file_paths:
-        try:
-            df = load_dataframe(file)
-            if df is not None:
-                datasets[file] = set(df.columns)
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load:\n{file}\n\n{e}")
-            return
+    window = tk.Toplevel(parent)
+    window.title("Joinable Datasets")
+    window.geometry("700x500")
 
-    similar_groups = []
-    used_files = set()
+    # Compares column values (not names) using small sketches of each key column
+    status = JobStatusBar(window)
+    status.pack(side="bottom", fill="x")
+    status.run("joins", lambda job: find_joins(list(file_paths), job),
+               on_done=lambda result: show_join_results(window, *result),
+               message="Sketching key columns...")
 
-    # Compare every pair of datasets
-    for file1, file2 in combinations(datasets.keys(), 2):
-        common_cols = datasets[file1] & datasets[file2]
 
-        # If they share enough columns, treat them as similar
-        if len(common_cols) >= 2:
-            group = {file1, file2}
+def find_joins(file_paths, job=None):
+    with timed("Join Finder", "sketch", f"{len(file_paths)} files"):
+        return find_join_keys(file_paths, job)
 
-            # Merge with existing group if overlapping
-            merged = False
-            for existing in similar_groups:
-                if existing & group:
-                    existing.update(group)
-                    merged = True
-                    break
 
-            if not merged:
-                similar_groups.append(group)
+def analyze_datasets(parent, file_paths):
+    window = tk.Toplevel(parent)
+    window.title("Dataset Comparison Results")
+    window.geometry("700x500")
 
-            used_files.update(group)
+    # Reading the files happens in the background; results fill this window
+    status = JobStatusBar(window)
+    status.pack(side="bottom", fill="x")
+    status.run("analyze", lambda job: compare_datasets(file_paths, job),
+               on_done=lambda result: show_results(window, *result),
+               message="Reading dataset headers...")
 
-    excluded_files = set(datasets.keys()) - used_files
 
-    show_results(parent, similar_groups, excluded_files, datasets)
+def compare_datasets(file_paths, job=None):
+    # Only the header rows are needed to compare columns
+    with timed("Compare Datasets", "read headers", f"{len(file_paths)} files"):
+        schemas = sniff_schemas(file_paths, job)
+    datasets = {file: columns for file, columns in schemas.items() if columns is not None}
 
+    with timed("Compare Datasets", "group"):
+        similar_groups = group_datasets(datasets)
+    used_files = set().union(*similar_groups)
 
-def show_results(parent, similar_groups, excluded_files, datasets):
-    window = tk.Toplevel(parent)
-    window.title("Dataset Comparison Results")
-    window.geometry("700x500")
+    excluded_files = set(datasets.keys()) - used_files
 
+    return similar_groups, excluded_files, datasets
+
+
+class UnionFind:
+    """Disjoint sets with path compression, used to merge overlapping groups."""
+
+    def __init__(self, items):
+        self.parent = {item: item for item in items}
+
+    def find(self, item):
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+    def groups(self):
+        members = defaultdict(list)
+        for item in self.parent:
+            members[self.find(item)].append(item)
+        return [set(group) for group in members.values() if len(group) > 1]
+
+
+def group_datasets(datasets, min_shared_columns=MIN_SHARED_COLUMNS, min_jaccard=MIN_JACCARD):
+    """Group files whose column sets are similar, merging groups transitively.
+
+    Files with identical column sets are grouped first, so pairs are only
+    counted between distinct schemas, and only those that share a column,
+    via an inverted index from column name to schemas. Pairs whose schemas
+    are already in the same group are not compared at all.
+    """
+    files_by_schema = defaultdict(list)
+    for file, columns in datasets.items():
+        files_by_schema[frozenset(columns)].append(file)
+
+    sets = UnionFind(datasets)
+    for schema, files in files_by_schema.items():
+        # Identical sets share every column with a Jaccard similarity of 1
+        if schema and len(schema) >= min_shared_columns:
+            for a, b in zip(files, files[1:]):
+                sets.union(a, b)
+
+    schemas = list(files_by_schema)
+    index = defaultdict(list)
+    for i, schema in enumerate(schemas):
+        for col in schema:
+            index[col].append(i)
+
+    linked = UnionFind(range(len(schemas)))
+    if min_shared_columns <= 1 and min_jaccard <= 0:
+        # Any shared column is enough: link each schema to the next one per column
+        for members in index.values():
+            for a, b in zip(members, members[1:]):
+                linked.union(a, b)
+    else:
+        # Prefix filter: with columns ordered rarest first, two schemas sharing at
+        # least k columns share one among each schema's first len - k + 1 columns.
+        # Only those prefixes are indexed, so common columns such as "country"
+        # alone never make pairs
+        k = max(min_shared_columns, 1)
+        prefix_index = defaultdict(list)
+        for i, schema in enumerate(schemas):
+            ordered = sorted(schema, key=lambda col: (len(index[col]), col))
+            for col in ordered[:len(ordered) - k + 1]:
+                prefix_index[col].append(i)
+
+        rejected = set()
+        for members in prefix_index.values():
+            # Root -> this column's schemas seen so far in that group
+            seen = {}
+            for a in members:
+                for root, group in seen.items():
+                    # Schemas already in one group need no comparing
+                    if linked.find(root) == linked.find(a):
+                        continue
+                    for b in group:
+                        if (b, a) in rejected:
+                            continue
+                        count = len(schemas[a] & schemas[b])
+                        if count >= min_shared_columns \
+                                and count / (len(schemas[a]) + len(schemas[b]) - count) >= min_jaccard:
+                            # The rest of this group is now linked to a as well
+                            linked.union(b, a)
+                            break
+                        rejected.add((b, a))
+                # a joins every group it is now linked to
+                root_a = linked.find(a)
+                merged = [seen.pop(root) for root in list(seen) if linked.find(root) == root_a]
+                merged.sort(key=len, reverse=True)
+                group = merged[0] if merged else []
+                for other in merged[1:]:
+                    group.extend(other)
+                group.append(a)
+                seen[root_a] = group
+
+    for a, root in ((i, linked.find(i)) for i in range(len(schemas))):
+        if a != root:
+            sets.union(files_by_schema[schemas[a]][0], files_by_schema[schemas[root]][0])
+
+    return sets.groups()
+
+
+def show_results(window, similar_groups, excluded_files, datasets):
     text = tk.Text(window, wrap="word")
     text.pack(expand=True, fill="both", padx=10, pady=10)
 
@@ -94,6 +208,9 @@ def show_results(parent, similar_groups, excluded_files, datasets):
             text.insert("end", "  Common columns:\n")
             for col in sorted(common):
                 text.insert("end", f"    - {col}\n")
+            if not common:
+                # Groups are transitive, so not every column is shared by all files
+                text.insert("end", "    (none shared by every file in the group)\n")
 
             text.insert("end", "\n")
     else:
@@ -104,4 +221,32 @@ def show_results(parent, similar_groups, excluded_files, datasets):
         for file in excluded_files:
             text.insert("end", f"  • {file}\n")
 
-    text.config(state="disabled")
\ No newline at end of file
+    text.config(state="disabled")
+
+
+def show_join_results(window, matches, unmatched):
+    text = tk.Text(window, wrap="word")
+    text.pack(expand=True, fill="both", padx=10, pady=10)
+
+    if matches:
+        text.insert("end", "Joinable dataset pairs (estimated from value sketches):\n\n")
+        for match in matches:
+            file_a, file_b = match["files"]
+            col_a, col_b = match["columns"]
+            text.insert("end", f"  • {file_a}\n  • {file_b}\n")
+            text.insert("end", f"    Join on: \"{col_a}\" = \"{col_b}\"\n")
+            text.insert(
+                "end",
+                f"    Containment: {match['containment']:.0%}   "
+                f"Jaccard: {match['jaccard']:.0%}   "
+                f"Shared values: ~{match['shared_values']:.0f}\n\n"
+            )
+    else:
+        text.insert("end", "No joinable datasets found.\n\n")
+
+    if unmatched:
+        text.insert("end", "Datasets with no join key in common:\n\n")
+        for file in unmatched:
+            text.insert("end", f"  • {file}\n")
+
+    text.config(state="disabled")
@@ -0,0 +1,226 @@
+import difflib
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import load_csv
+from registry import dataset_signature
+from worldbank import load_wide
+
+# Spellings used by the UN/WHO style files (life.csv, pollution.csv) and common
+# short names, keyed by the World Bank ISO3 code they refer to
+ALIASES = {
+    "BHS": ["Bahamas"],
+    "BOL": ["Bolivia (Plurinational State of)"],
+    "CIV": ["Côte d'Ivoire", "Ivory Coast"],
+    "COD": ["Democratic Republic of the Congo", "DR Congo"],
+    "COG": ["Congo", "Republic of the Congo"],
+    "CPV": ["Cape Verde"],
+    "CZE": ["Czech Republic"],
+    "EGY": ["Egypt"],
+    "FSM": ["Micronesia (Federated States of)", "Micronesia"],
+    "GBR": ["United Kingdom of Great Britain and Northern Ireland", "UK", "Great Britain"],
+    "GMB": ["Gambia"],
+    "IRN": ["Iran (Islamic Republic of)", "Iran"],
+    "KGZ": ["Kyrgyzstan"],
+    "KNA": ["Saint Kitts and Nevis"],
+    "KOR": ["Republic of Korea", "South Korea"],
+    "LAO": ["Lao People's Democratic Republic", "Laos"],
+    "LCA": ["Saint Lucia"],
+    "MDA": ["Republic of Moldova"],
+    "MKD": ["The former Yugoslav republic of Macedonia", "Republic of North Macedonia", "Macedonia"],
+    "PRK": ["Democratic People's Republic of Korea", "North Korea"],
+    "PSE": ["State of Palestine", "Palestine"],
+    "RUS": ["Russia"],
+    "SVK": ["Slovakia"],
+    "SWZ": ["Swaziland", "Kingdom of Eswatini"],
+    "SYR": ["Syria"],
+    "TUR": ["Turkey"],
+    "TZA": ["United Republic of Tanzania"],
+    "USA": ["United States of America", "USA", "US"],
+    "VCT": ["Saint Vincent and the Grenadines"],
+    "VEN": ["Venezuela (Bolivarian Republic of)", "Venezuela"],
+    "VNM": ["Vietnam"],
+    "YEM": ["Yemen"],
+}
+
+# World Bank codes for regions, income groups and other aggregates
+AGGREGATE_CODES = {
+    "AFE", "AFW", "ARB", "CEB", "CSS", "EAP", "EAR", "EAS", "ECA", "ECS", "EMU",
+    "EUU", "FCS", "HIC", "HPC", "IBD", "IBT", "IDA", "IDB", "IDX", "INX", "LAC",
+    "LCN", "LDC", "LIC", "LMC", "LMY", "LTE", "MEA", "MIC", "MNA", "NAC", "OED",
+    "OSS", "PRE", "PSS", "PST", "SAS", "SSA", "SSF", "SST", "TEA", "TEC", "TLA",
+    "TMN", "TSA", "TSS", "UMC", "WLD",
+}
+
+# Files whose names (and codes, for World Bank files) seed the index
+WIDE_SOURCES = ["population.csv", "internet.csv"]
+NAME_SOURCES = {"life.csv": "Country", "pollution.csv": "Country"}
+
+# Minimum difflib ratio for a fuzzy match to be accepted
+FUZZY_CUTOFF = 0.85
+FUZZY_CANDIDATES = 10
+
+
+def normalize_name(name):
+    """Alias key: accents, case, punctuation and "&" vs "and" are ignored."""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.casefold().replace("&", " and ")
+    text = "".join(ch if ch.isalnum() else " " if ch in " -,./()" else "" for ch in text)
+    return " ".join(text.split())
+
+
+class CountryIndex:
+    """Crosswalk from every known country name, alias and ISO3 code to an integer ID.
+
+    Exact lookups are a dict access on the normalised name. Names that are not
+    known are matched fuzzily: a trigram index picks a few candidates, which
+    are then scored with difflib.
+
+    The shared index is used from job threads and the Tk thread at once, so
+    ``add`` and the fuzzy lookup structures are guarded by a lock.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.codes = []
+        self.aggregate = []
+        self.lookup = {}
+        self.fuzzy_cache = {}
+        self.gram_postings = None
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, code=None, aggregate=False):
+        """Register ``name`` (and ``code``), returning the country's ID."""
+        key = normalize_name(name)
+        code = str(code).strip().upper() if isinstance(code, str) and code.strip() else None
+        with self.lock:
+            return self._add(name, key, code, aggregate)
+
+    def _add(self, name, key, code, aggregate):
+        country_id = self.lookup.get(code) if code else None
+        if country_id is None:
+            country_id = self.lookup.get(key)
+        if country_id is None:
+            country_id = len(self.names)
+            self.names.append(name)
+            self.codes.append(code)
+            self.aggregate.append(aggregate)
+        elif code and self.codes[country_id] is None:
+            self.codes[country_id] = code
+
+        self.lookup.setdefault(key, country_id)
+        if code:
+            self.lookup.setdefault(code, country_id)
+        # New aliases can change fuzzy matches, so both are rebuilt on demand
+        self.gram_postings = None
+        self.fuzzy_cache = {}
+        return country_id
+
+    def id_of(self, name, fuzzy=True):
+        """ID for a name or ISO3 code, or None if nothing close is known."""
+        if not isinstance(name, str) or not name.strip():
+            return None
+        country_id = self.lookup.get(name.strip().upper())
+        if country_id is None:
+            country_id = self.lookup.get(normalize_name(name))
+        if country_id is None and fuzzy:
+            country_id = self.fuzzy_id(name)
+        return country_id
+
+    def ids_of(self, names, fuzzy=False):
+        """IDs for an array of names (-1 where unknown), resolving each distinct name once."""
+        codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+        unique_ids = np.array(
+            [-1 if (i := self.id_of(name, fuzzy)) is None else i for name in uniques],
+            dtype=np.int32,
+        )
+        ids = np.full(len(codes), -1, dtype=np.int32)
+        present = codes >= 0
+        ids[present] = unique_ids[codes[present]]
+        return ids
+
+    def name_of(self, country_id):
+        return self.names[country_id]
+
+    def is_aggregate(self, country_id):
+        return self.aggregate[country_id]
+
+    def fuzzy_id(self, name):
+        key = normalize_name(name)
+        with self.lock:
+            return self._fuzzy_id(key)
+
+    def _fuzzy_id(self, key):
+        if key in self.fuzzy_cache:
+            return self.fuzzy_cache[key]
+
+        if self.gram_postings is None:
+            self.keys = list(self.lookup)
+            self.gram_postings = defaultdict(list)
+            for i, alias in enumerate(self.keys):
+                for gram in trigrams(alias):
+                    self.gram_postings[gram].append(i)
+
+        # Score only the aliases sharing the most trigrams with the query
+        shared = Counter()
+        for gram in trigrams(key):
+            shared.update(self.gram_postings.get(gram, ()))
+        best, best_score = None, FUZZY_CUTOFF
+        for i, _ in shared.most_common(FUZZY_CANDIDATES):
+            score = difflib.SequenceMatcher(None, key, self.keys[i]).ratio()
+            if score >= best_score:
+                best, best_score = self.lookup[self.keys[i]], score
+
+        self.fuzzy_cache[key] = best
+        return best
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def build_country_index(wide_tables=(), name_lists=()):
+    index = CountryIndex()
+    # World Bank name/code pairs come first so their spellings are canonical
+    for table in wide_tables:
+        for name, code in zip(table.countries, table.codes):
+            index.add(name, code, aggregate=code in AGGREGATE_CODES)
+    for code, aliases in ALIASES.items():
+        for alias in aliases:
+            index.add(alias, code)
+    for names in name_lists:
+        for name in pd.unique(pd.Series(names, dtype=object).dropna()):
+            if index.id_of(name, fuzzy=False) is None:
+                index.add(name)
+    return index
+
+
+_index_cache = {}
+_index_lock = threading.Lock()
+
+
+def get_country_index():
+    """Index over every country name in the bundled datasets, rebuilt when they change."""
+    paths, signature = dataset_signature([*WIDE_SOURCES, *NAME_SOURCES])
+
+    with _index_lock:
+        if signature not in _index_cache:
+            wide_tables = [load_wide(paths[name]) for name in WIDE_SOURCES if name in paths]
+            name_lists = []
+            for name, column in NAME_SOURCES.items():
+                if name in paths:
+                    frame = load_csv(paths[name])
+                    frame.columns = frame.columns.str.strip()
+                    name_lists.append(frame[column].to_numpy(dtype=object))
+            _index_cache.clear()
+            _index_cache[signature] = build_country_index(wide_tables, name_lists)
+        return _index_cache[signature]
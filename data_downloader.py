@@ -1,16 +1,29 @@
 import tkinter as tk
-from tkinter import ttk
-import csv
-import os
+from tkinter import ttk, messagebox
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.lines import Line2D
+import pandas as pd
+from worldbank import load_wide, wide_from_frame, key_columns, MISSING_MARKERS
+from jobs import JobStatusBar
+from search_index import SubstringIndex
+from registry import resolve_dataset
+from countries import get_country_index
+from instrumentation import timed, record_dataset
+from chart_cache import get_chart_cache, region_bytes
+from file_watch import WatchedDataset, parse_rows
+from downsample import LevelOfDetail
 
 
 class SearchableComboBox:
     """Searchable dropdown list attached to an Entry widget."""
 
-    def __init__(self, entry_widget, options, on_select_callback):
-        self.options = options
+    # Wait for a pause in typing before filtering
+    DEBOUNCE_MS = 120
+
+    def __init__(self, entry_widget, options, on_select_callback, resolve_alias=None):
+        # resolve_alias maps a typed name with no matches (e.g. "USA") to an option
+        self.resolve_alias = resolve_alias
         self.entry = entry_widget
         self.on_select_callback = on_select_callback
         self.listbox = tk.Listbox(self.entry.master, height=5)
@@ -18,18 +31,66 @@ class SearchableComboBox:
         self.entry.bind("<KeyRelease>", self.on_entry_key)
         self.entry.bind("<FocusIn>", self.show_dropdown)
         self.entry.bind("<FocusOut>", self.hide_dropdown)
+        self.pending_filter = None
 
-        for option in self.options:
-            self.listbox.insert(tk.END, option)
+        self.set_options(options)
 
-    def on_entry_key(self, event):
-        typed_value = self.entry.get().strip().lower()
+    def set_options(self, options):
+        self.options = options
+        self.index = SubstringIndex(options)
+        self.last_query = ""
+        self.last_matches = self.index.search("")
+        self.shown = []
         self.listbox.delete(0, tk.END)
-        for option in self.options:
-            if typed_value in option.lower():
-                self.listbox.insert(tk.END, option)
+        self.apply_filter()
+        self.hide_dropdown()
+
+    def on_entry_key(self, event):
+        if self.pending_filter is not None:
+            self.entry.after_cancel(self.pending_filter)
+        self.pending_filter = self.entry.after(self.DEBOUNCE_MS, self.apply_filter)
         self.show_dropdown()
 
+    def apply_filter(self):
+        self.pending_filter = None
+        typed_value = self.entry.get().strip().lower()
+
+        with timed("Search box", "filter", typed_value):
+            # Extra characters can only narrow the previous result
+            within = self.last_matches if self.last_query in typed_value else None
+            matches = self.index.search(typed_value, within)
+            self.last_query, self.last_matches = typed_value, matches
+
+            shown = matches.tolist()
+            if not shown and typed_value and self.resolve_alias is not None:
+                # Offer the canonical spelling, e.g. "United States" for "united states of america"
+                position = self.index.position_of(self.resolve_alias(typed_value))
+                if position is not None:
+                    shown = [position]
+            self.update_listbox(shown)
+
+    def update_listbox(self, matches):
+        """Apply only the rows that changed, deleting and inserting whole runs at once."""
+        old, new = self.shown, matches
+        i = j = position = 0
+        while i < len(old) or j < len(new):
+            if j == len(new) or (i < len(old) and old[i] < new[j]):
+                start = i
+                while i < len(old) and (j == len(new) or old[i] < new[j]):
+                    i += 1
+                self.listbox.delete(position, position + i - start - 1)
+            elif i == len(old) or new[j] < old[i]:
+                start = j
+                while j < len(new) and (i == len(old) or new[j] < old[i]):
+                    j += 1
+                self.listbox.insert(position, *(self.options[k] for k in new[start:j]))
+                position += j - start
+            else:
+                i += 1
+                j += 1
+                position += 1
+        self.shown = new
+
     def on_select(self, event):
         if self.listbox.curselection():
             selected_option = self.listbox.get(self.listbox.curselection())
@@ -48,7 +109,42 @@ class SearchableComboBox:
             self.listbox.place_forget()
 
 
+class ChartToolbar(NavigationToolbar2Tk):
+    """Navigation toolbar that calls ``before_use`` before any tool reads or redraws the axes."""
+
+    def __init__(self, canvas, window, before_use):
+        self.before_use = before_use
+        super().__init__(canvas, window, pack_toolbar=False)
+
+    def home(self, *args):
+        self.before_use()
+        super().home(*args)
+
+    def back(self, *args):
+        self.before_use()
+        super().back(*args)
+
+    def forward(self, *args):
+        self.before_use()
+        super().forward(*args)
+
+    def pan(self, *args):
+        self.before_use()
+        super().pan(*args)
+
+    def zoom(self, *args):
+        self.before_use()
+        super().zoom(*args)
+
+    def save_figure(self, *args):
+        self.before_use()
+        return super().save_figure(*args)
+
+
 class PopulationApp:
+    # Overlays with more countries than this get no legend
+    MAX_LEGEND = 20
+
     def __init__(self, root):
         self.root = root
         self.root.title("Population Trends")
@@ -58,75 +154,217 @@ class PopulationApp:
 
         self.pop_file_path = self.find_csv_file("population.csv")
         if not self.pop_file_path:
-            tk.messagebox.showerror("File Not Found", "population.csv not found in the directory.")
+            messagebox.showerror("File Not Found", "population.csv not found in the data folders.")
             root.destroy()
             return
 
-        self.countries, self.population_data = self.read_population_data()
+        self.countries, self.population_data = [], {}
+        # Countries currently drawn, in the order they were added
+        self.selected = []
+        # Reduces long series to the chart's pixel width; replaced on every redraw
+        self.lod = None
+        self.country_index, self.country_by_id = None, {}
 
         # Entry with Searchable ComboBox for country selection
         tk.Label(self.main_frame, text="Select a Country:").pack(pady=(0,5))
         self.country_entry = tk.Entry(self.main_frame)
         self.country_entry.pack(fill=tk.X)
-        self.searchable_combo = SearchableComboBox(self.country_entry, self.countries, self.on_country_selected)
+        self.searchable_combo = SearchableComboBox(self.country_entry, self.countries, self.on_country_selected,
+                                                   resolve_alias=self.resolve_country)
 
         # Plot button
         self.plot_button = ttk.Button(self.main_frame, text="Plot Population Over Years", command=self.plot_population)
         self.plot_button.pack(pady=10)
 
+        # Several countries or regions can be overlaid on one chart
+        selection_frame = ttk.Frame(self.main_frame)
+        selection_frame.pack(fill=tk.X)
+        self.selection_list = tk.Listbox(selection_frame, height=4, selectmode=tk.EXTENDED)
+        self.selection_list.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        selection_buttons = ttk.Frame(selection_frame)
+        selection_buttons.pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(selection_buttons, text="Add to Plot", command=self.add_country).pack(fill=tk.X)
+        ttk.Button(selection_buttons, text="Remove", command=self.remove_countries).pack(fill=tk.X)
+        ttk.Button(selection_buttons, text="Clear", command=self.clear_countries).pack(fill=tk.X)
+
         # Matplotlib figure embedded in Tkinter
         self.figure, self.ax = plt.subplots(figsize=(8,5))
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.main_frame)
+        # Zoom and pan; long series are downsampled again for the new range
+        self.toolbar = ChartToolbar(self.canvas, self.main_frame, before_use=self.ensure_chart)
+        self.toolbar.pack(side=tk.BOTTOM, fill=tk.X)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        # Set while the canvas shows a cached chart whose artists were not built
+        self.unbuilt_chart = None
+        self.canvas.mpl_connect("button_press_event", self.ensure_chart)
+        self.canvas.mpl_connect("resize_event", self.ensure_chart)
+        self.canvas.mpl_connect("motion_notify_event", self.on_hover)
+
+        # Parse the CSV off the Tk thread so other windows stay responsive
+        self.status = JobStatusBar(self.main_frame)
+        self.status.pack(fill=tk.X, before=self.plot_button)
+        # Rows or year columns added to the file while the window is open are merged in place
+        self.dataset = WatchedDataset(self.root, self.status, "population data", lambda: self.pop_file_path,
+                                      self.read_population_data, self.merge_change, self.on_data_loaded).start()
 
     def find_csv_file(self, filename):
-        for dirpath, _, filenames in os.walk(os.getcwd()):
-            if filename in filenames:
-                return os.path.join(dirpath, filename)
-        return None
-
-    def read_population_data(self):
-        countries = []
-        population_data = {}
-
-        with open(self.pop_file_path, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                country = row['country_name']
-                countries.append(country)
-                population_data[country] = {}
-
-                for col in row.keys():
-                    if col.isdigit():
-                        try:
-                            population_data[country][int(col)] = float(row[col])
-                        except ValueError:
-                            # skip invalid values
-                            pass
-
-        return countries, population_data
+        # The registry remembers where datasets live instead of walking the disk
+        return resolve_dataset(filename)
+
+    def read_population_data(self, path):
+        # Dense countries x years array; missing values are NaN
+        with timed("Population", "load"):
+            return load_wide(path)
+
+    def read_country_index(self):
+        index = get_country_index()
+        ids = index.ids_of(self.countries)
+        return index, {country_id: name for country_id, name in zip(ids.tolist(), self.countries) if country_id >= 0}
+
+    def resolve_country(self, name):
+        """Row name in population.csv for any known spelling or ISO3 code of a country."""
+        if name in self.population_data:
+            return name
+        if self.country_index is None:
+            return None
+        return self.country_by_id.get(self.country_index.id_of(name))
+
+    def on_data_loaded(self, table):
+        countries = table.countries.tolist()
+        new_countries = countries != self.countries
+        self.countries, self.population_data = countries, table
+        record_dataset("Population", "population.csv", table)
+        self.refresh_views()
+        if new_countries:
+            # Aliases are a nice-to-have, so they load after the data is usable
+            self.status.run("aliases", lambda job: self.read_country_index(),
+                            on_done=self.on_country_index_loaded, on_error=lambda error: None,
+                            message="Loading country names...")
+
+    def on_country_index_loaded(self, result):
+        self.country_index, self.country_by_id = result
+
+    def merge_change(self, change, table):
+        with timed("Population", "append", change.kind):
+            if change.kind == "rows":
+                rows = parse_rows(change.data, self.dataset.columns(), na_values=MISSING_MARKERS)
+                return table.with_rows(wide_from_frame(rows))
+            return self.read_new_years(change.columns)
+
+    def read_new_years(self, columns):
+        """The table with the added year columns, reading only those columns; None if a full reload is needed."""
+        years = [col for col in columns if col.strip().isdigit()]
+        if len(years) != len(columns):
+            return None
+        added = wide_from_frame(pd.read_csv(self.pop_file_path, na_values=MISSING_MARKERS,
+                                            usecols=[*key_columns(self.dataset.columns()), *years]))
+        if added.countries.tolist() != self.countries:
+            # Rows were added or reordered as well
+            return None
+        return self.population_data.with_years(added.years, added.values)
+
+    def refresh_views(self):
+        self.searchable_combo.set_options(self.countries)
+        self.selected = [country for country in self.selected if country in self.population_data]
+        if self.selected:
+            self.draw_population(self.selected)
 
     def on_country_selected(self, country):
         # Optional: auto-plot when country selected
         pass
 
+    def entry_country(self):
+        country = self.resolve_country(self.country_entry.get().strip())
+        if country is None:
+            messagebox.showwarning("Invalid Country", "Please select a valid country from the list.")
+        return country
+
     def plot_population(self):
-        country = self.country_entry.get().strip()
-        if country not in self.population_data:
-            tk.messagebox.showwarning("Invalid Country", "Please select a valid country from the list.")
-            return
+        country = self.entry_country()
+        if country is not None:
+            self.draw_population([country])
+
+    def add_country(self):
+        country = self.entry_country()
+        if country is not None and country not in self.selected:
+            self.draw_population(self.selected + [country])
 
-        years = sorted(self.population_data[country].keys())
-        populations = [self.population_data[country][year] for year in years]
+    def remove_countries(self):
+        removed = {self.selection_list.get(i) for i in self.selection_list.curselection()}
+        if not removed:
+            # Nothing picked in the list: remove the country typed in the entry
+            removed = {self.resolve_country(self.country_entry.get().strip())}
+        self.draw_population([country for country in self.selected if country not in removed])
 
+    def clear_countries(self):
+        self.draw_population([])
+
+    def draw_population(self, countries):
+        self.selected = countries
+        self.selection_list.delete(0, tk.END)
+        self.selection_list.insert(tk.END, *countries)
+        with timed("Population", "plot", f"{len(countries)} countries"):
+            cache = get_chart_cache()
+            key = (self.dataset.version, tuple(countries), self.canvas.get_width_height())
+            cached = cache.get(key)
+            if cached is not None:
+                # Blit the stored image; its artists are only built once the user zooms, pans or hovers
+                if self.lod is not None:
+                    self.lod.remove()
+                    self.lod = None
+                self.unbuilt_chart = cached
+                self.canvas.restore_region(cached)
+                self.canvas.blit(self.figure.bbox)
+                return
+            self.build_chart(countries)
+            self.canvas.draw()
+            cache.put(key, self.canvas.copy_from_bbox(self.figure.bbox), region_bytes(self.figure))
+
+    def build_chart(self, countries):
+        """Lay out the artists of the chart for ``countries`` without drawing it."""
+        if self.lod is not None:
+            self.lod.remove()
+        self.unbuilt_chart = None
         self.ax.clear()
-        self.ax.plot(years, populations, marker='o', color='blue')
-        self.ax.set_title(f"Population over Years: {country}")
+        self.lod = LevelOfDetail(self.ax)
+        if len(countries) == 1:
+            years, populations = self.population_data.series(countries[0])
+            self.lod.plot(years, populations, marker='o', color='blue')
+            self.ax.set_title(f"Population over Years: {countries[0]}")
+        elif countries:
+            self.draw_overlay(countries)
         self.ax.set_xlabel("Year")
         self.ax.set_ylabel("Population (units as per data)")
         self.ax.grid(True)
+        self.lod.enable_tooltips()
+        # Home goes back to this chart's full range
+        self.toolbar.update()
+
+    def ensure_chart(self, event=None):
+        """Build the artists of a chart that was shown from the cache, before anything uses them."""
+        if self.unbuilt_chart is None:
+            return
+        shown = self.unbuilt_chart
+        self.build_chart(self.selected)
+        # The canvas still shows the cached image, which is what the tooltip is blitted over
+        self.lod.background = shown
+
+    def on_hover(self, event):
+        if self.unbuilt_chart is not None:
+            self.ensure_chart()
+            self.lod.on_motion(event)
 
-        self.canvas.draw()
+    def draw_overlay(self, countries):
+        """All selected series as one LineCollection, so the draw cost barely grows with the count."""
+        table = self.population_data
+        # Each row is a view into the countries x years array; NaN years leave a gap in the line
+        colors = [plt.cm.tab20(i % 20) for i in range(len(countries))]
+        self.lod.add_collection([(table.years, table.row(country)) for country in countries],
+                                colors=colors, linewidths=1.5)
+        self.ax.set_title(f"Population over Years: {len(countries)} countries")
+        if len(countries) <= self.MAX_LEGEND:
+            handles = [Line2D([], [], color=color) for color in colors]
+            self.ax.legend(handles, countries, fontsize=7, ncol=2 if len(countries) > 10 else 1)
 
 
 if __name__ == "__main__":
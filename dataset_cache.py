@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Converted datasets live here, one sub-directory per source file
+CACHE_DIR = os.environ.get(
+    "DATA_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".datacache")
+)
+
+# Bump whenever the on-disk layout changes so old caches get rebuilt
+FORMAT_VERSION = 3
+
+# In compact mode, text columns with at most this many distinct values per row
+# become categoricals (country names, statuses, AQI categories...)
+CATEGORY_MAX_RATIO = 0.5
+# Whole numbers above this are no longer exact in float32
+FLOAT32_MAX_WHOLE = 2 ** 24
+
+
+def source_signature(path):
+    """Identity of a source file: absolute path, size and modification time."""
+    stat = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def cache_dir_for(path, variant=""):
+    """Directory that holds the converted copy of ``path``.
+
+    ``variant`` separates caches of the same file read with different options.
+    """
+    key = os.path.abspath(path) + "\0" + variant
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{os.path.basename(path)}-{digest}")
+
+
+def load_csv(path, compact=False, **read_csv_kwargs):
+    """Load a CSV file through the binary cache.
+
+    The first call parses the CSV with pandas and stores every column as a
+    ``.npy`` block; later calls memory-map those blocks instead of parsing
+    text again. The cache is rebuilt whenever the source size or mtime changes.
+
+    With ``compact`` the frame gets the smaller dtypes from ``compact_frame``,
+    and those are what is cached, so categoricals come straight from the
+    stored codes.
+    """
+    options = dict(read_csv_kwargs, _compact=True) if compact else read_csv_kwargs
+    variant = json.dumps(options, sort_keys=True, default=str)
+    signature = source_signature(path)
+    target = cache_dir_for(path, variant)
+
+    df = read_cached_frame(target, signature, variant)
+    if df is None:
+        df = pd.read_csv(path, **read_csv_kwargs)
+        if compact:
+            df = compact_frame(df)
+        write_cached_frame(target, signature, variant, df)
+    return df
+
+
+def compact_frame(df):
+    """Copy of ``df`` with the smallest dtypes that hold its values.
+
+    Repetitive text becomes categorical, integers the smallest int type that
+    fits their range, and floats float32 unless the column holds whole numbers
+    too large for float32 to store exactly (populations stay float64).
+    """
+    return pd.DataFrame({name: compact_column(df[name]) for name in df.columns}, columns=df.columns)
+
+
+def compact_column(series):
+    values = series.to_numpy()
+    kind = series.dtype.kind
+
+    if kind in "iu" and len(values):
+        low, high = values.min(), values.max()
+        for dtype in (np.int8, np.int16, np.int32):
+            if np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+                return series.astype(dtype)
+        return series
+
+    if kind == "f":
+        finite = np.abs(values[np.isfinite(values)])
+        whole = finite[finite == np.round(finite)]
+        if (not len(finite) or finite.max() <= np.finfo(np.float32).max) \
+                and (not len(whole) or whole.max() <= FLOAT32_MAX_WHOLE):
+            return series.astype(np.float32)
+        return series
+
+    if kind == "O" and pd.api.types.infer_dtype(series, skipna=True) == "string":
+        codes, uniques = pd.factorize(series, sort=True)
+        if len(uniques) <= max(1, len(series) * CATEGORY_MAX_RATIO):
+            return pd.Series(pd.Categorical.from_codes(codes, uniques), index=series.index, name=series.name)
+    return series
+
+
+def memory_report(before, after):
+    """Rows of (column, dtype before, dtype after, bytes before, bytes after)."""
+    before_bytes = before.memory_usage(deep=True, index=False)
+    after_bytes = after.memory_usage(deep=True, index=False)
+    return [
+        (name, str(before[name].dtype), str(after[name].dtype), int(before_bytes[name]), int(after_bytes[name]))
+        for name in before.columns
+    ]
+
+
+def read_cached_frame(target, signature, variant=""):
+    """Return the cached frame in ``target``, or None if it is missing or stale."""
+    try:
+        with open(os.path.join(target, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if (meta.get("format") != FORMAT_VERSION
+            or meta.get("source") != signature
+            or meta.get("variant") != variant):
+        return None
+
+    try:
+        columns = {}
+        for i, column in enumerate(meta["columns"]):
+            columns[column["name"]] = _load_column(target, i, column)
+        return pd.DataFrame(columns, columns=[c["name"] for c in meta["columns"]])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def write_cached_frame(target, signature, variant, df):
+    """Store ``df`` as one binary block per column. Failures are not fatal."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".tmp-", dir=CACHE_DIR)
+    except OSError:
+        return
+
+    try:
+        columns = []
+        for i, name in enumerate(df.columns):
+            columns.append(_save_column(staging, i, name, df[name]))
+
+        meta = {
+            "format": FORMAT_VERSION,
+            "source": signature,
+            "variant": variant,
+            "rows": len(df),
+            "columns": columns,
+        }
+        with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+        if os.path.isdir(target):
+            shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def clear_cache():
+    """Remove every converted dataset."""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+def _save_column(directory, i, name, series):
+    # Numbers are stored as-is, everything else as integer codes + categories
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = np.array([str(value) for value in series.cat.categories], dtype=str)
+        np.save(os.path.join(directory, f"{i}.codes.npy"), series.cat.codes.to_numpy().astype(np.int32))
+        np.save(os.path.join(directory, f"{i}.cats.npy"), categories)
+        return {"name": name, "kind": "category"}
+
+    if series.dtype.kind in "biuf":
+        np.save(os.path.join(directory, f"{i}.npy"), series.to_numpy())
+        return {"name": name, "kind": "numeric"}
+
+    if series.dtype.kind in "Mm":
+        # Datetimes (UTC for tz-aware ones) and timedeltas as int64 ticks; NaT is the int64 minimum
+        np.save(os.path.join(directory, f"{i}.npy"), series.array.asi8)
+        if series.dtype.kind == "m":
+            return {"name": name, "kind": "timedelta", "unit": series.dt.unit}
+        tz = series.dt.tz
+        return {"name": name, "kind": "datetime", "unit": series.dt.unit, "tz": None if tz is None else str(tz)}
+
+    if pd.api.types.infer_dtype(series, skipna=True) not in ("string", "empty"):
+        # Mixed values (numbers and text in one spreadsheet column, times...) keep their Python types
+        np.save(os.path.join(directory, f"{i}.npy"), series.to_numpy(dtype=object), allow_pickle=True)
+        return {"name": name, "kind": "object"}
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    categories = np.array([str(value) for value in uniques], dtype=str)
+    np.save(os.path.join(directory, f"{i}.codes.npy"), codes.astype(np.int32))
+    np.save(os.path.join(directory, f"{i}.cats.npy"), categories)
+    return {"name": name, "kind": "text"}
+
+
+def _load_column(directory, i, column):
+    if column["kind"] == "numeric":
+        return np.load(os.path.join(directory, f"{i}.npy"), mmap_mode="r")
+    if column["kind"] == "timedelta":
+        return np.load(os.path.join(directory, f"{i}.npy")).view(f"timedelta64[{column['unit']}]")
+    if column["kind"] == "datetime":
+        values = pd.DatetimeIndex(np.load(os.path.join(directory, f"{i}.npy")).view(f"datetime64[{column['unit']}]"))
+        if column["tz"] is not None:
+            values = values.tz_localize("UTC").tz_convert(column["tz"])
+        return values.array
+    if column["kind"] == "object":
+        return pd.array(np.load(os.path.join(directory, f"{i}.npy"), allow_pickle=True), dtype=object)
+
+    codes = np.load(os.path.join(directory, f"{i}.codes.npy"), mmap_mode="r")
+    categories = np.load(os.path.join(directory, f"{i}.cats.npy"))
+    if column["kind"] == "category":
+        return pd.Categorical.from_codes(codes, categories.astype(object))
+
+    # The extra trailing slot turns the -1 "missing" code into NaN
+    lookup = np.empty(len(categories) + 1, dtype=object)
+    lookup[:-1] = categories
+    lookup[-1] = np.nan
+    return lookup[codes]
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python dataset_cache.py FILE.csv ...: memory of each column with and without compact dtypes
+    for path in sys.argv[1:]:
+        full = pd.read_csv(path)
+        rows = memory_report(full, compact_frame(full))
+        print(f"{path}:")
+        for name, old_dtype, new_dtype, old_bytes, new_bytes in rows:
+            print(f"  {name.strip():34} {old_dtype:>8} -> {new_dtype:<9} {old_bytes / 1024:9.1f} KB -> {new_bytes / 1024:9.1f} KB")
+        old_total = sum(row[3] for row in rows)
+        new_total = sum(row[4] for row in rows)
+        print(f"  {'total':34} {'':21} {old_total / 2**20:9.2f} MB -> {new_total / 2**20:6.2f} MB "
+              f"({old_total / max(new_total, 1):.1f}x smaller)")
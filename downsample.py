@@ -0,0 +1,194 @@
+import numpy as np
+from matplotlib.collections import LineCollection
+
+# Series longer than this many points per pixel of axes width are reduced
+POINTS_PER_PIXEL = 2
+# Markers are only drawn while every visible point is shown and there are at most this many
+MAX_MARKERS = 200
+
+
+def min_max(x, y, buckets):
+    """The lowest and highest point of each of ``buckets`` equal slices, in x order.
+
+    Keeps every peak and trough, so the line's envelope is exact at the
+    resolution it is drawn at.
+    """
+    n = len(x)
+    if n <= 2 * buckets:
+        return x, y
+    bucket = np.arange(n) * buckets // n
+    starts = np.searchsorted(bucket, np.arange(buckets))
+    ends = np.append(starts[1:], n) - 1
+    missing = np.isnan(y)
+    # Sorted by bucket, then by value: each bucket's min comes first and its max last.
+    # NaN sorts after every value, so it is pushed out of the way of the min and the max separately
+    lowest = np.lexsort((np.where(missing, np.inf, y), bucket))[starts]
+    highest = np.lexsort((np.where(missing, -np.inf, y), bucket))[ends]
+    picked = np.concatenate([lowest, highest])
+    # Buckets with no values pick a NaN; only gaps below keep NaN points
+    picked = picked[~missing[picked]]
+    # The first NaN of each bucket that has one keeps the line broken there
+    gaps = np.flatnonzero(missing)
+    gaps = gaps[np.unique(bucket[gaps], return_index=True)[1]]
+    keep = np.unique(np.concatenate([picked, gaps, [0, n - 1]]))
+    return x[keep], y[keep]
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: ``threshold`` points that keep the series' shape."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    xf, yf = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    # threshold - 2 buckets between the fixed first and last points
+    edges = np.append(np.linspace(1, n - 1, threshold - 1).astype(int), n)
+    keep = np.empty(threshold, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_x, next_y = xf[hi:edges[i + 2]].mean(), yf[hi:edges[i + 2]].mean()
+        # Twice the triangle area between the last kept point, each candidate and the next bucket's mean
+        area = np.abs((xf[a] - next_x) * (yf[lo:hi] - yf[a]) - (xf[a] - xf[lo:hi]) * (next_y - yf[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+METHODS = {"minmax": min_max, "lttb": lambda x, y, buckets: lttb(x, y, buckets * POINTS_PER_PIXEL)}
+
+
+def visible(x, y, xmin, xmax):
+    """The part of a sorted series inside [xmin, xmax], plus one point either side so lines reach the edges."""
+    lo = max(0, np.searchsorted(x, xmin) - 1)
+    hi = min(len(x), np.searchsorted(x, xmax, side="right") + 1)
+    return x[lo:hi], y[lo:hi]
+
+
+class LevelOfDetail:
+    """Keeps the line series of one axes reduced to what its pixel width can show.
+
+    The full series are kept in ``series`` (for tooltips and export); only
+    the drawn artists get reduced data, recomputed whenever the x range
+    changes (toolbar zoom and pan) or the canvas is resized. Call ``remove``
+    before the axes are cleared.
+    """
+
+    def __init__(self, ax, method="minmax"):
+        self.ax = ax
+        self.reduce = METHODS[method]
+        self.series = []
+        self.artists = []
+        self.tooltip = None
+        ax.callbacks.connect("xlim_changed", self.update)
+        self.connections = [ax.figure.canvas.mpl_connect("resize_event", self.update)]
+
+    def plot(self, x, y, **kwargs):
+        """Like ``ax.plot`` for one sorted series."""
+        marker = kwargs.pop("marker", None)
+        line, = self.ax.plot([], [], **kwargs)
+        self.add(line, [(np.asarray(x), np.asarray(y))], marker)
+        return line
+
+    def add_collection(self, series, **kwargs):
+        """One LineCollection holding every (x, y) series."""
+        collection = LineCollection([np.empty((0, 2))] * len(series), **kwargs)
+        self.ax.add_collection(collection, autolim=False)
+        self.add(collection, [(np.asarray(x), np.asarray(y)) for x, y in series])
+        return collection
+
+    def add(self, artist, series, marker=None):
+        self.artists.append((artist, len(self.series), len(series), marker))
+        self.series.extend(series)
+        # Autoscale to the full data, not to whichever points were kept
+        points = [(x.min(), np.nanmin(y)) for x, y in series if len(x)] + \
+                 [(x.max(), np.nanmax(y)) for x, y in series if len(x)]
+        if points:
+            self.ax.update_datalim(points)
+            self.ax.autoscale_view()
+        self.update()
+
+    def update(self, *_):
+        width = int(self.ax.bbox.width)
+        if width <= 0:
+            return
+        xmin, xmax = sorted(self.ax.get_xlim())
+        for artist, start, count, marker in self.artists:
+            reduced, shown_all = [], True
+            for x, y in self.series[start:start + count]:
+                vx, vy = visible(x, y, xmin, xmax)
+                rx, ry = self.reduce(vx, vy, width)
+                reduced.append((rx, ry))
+                shown_all = shown_all and len(rx) == len(vx) and len(vx) <= MAX_MARKERS
+            if isinstance(artist, LineCollection):
+                artist.set_segments([np.column_stack(pair) for pair in reduced])
+            else:
+                artist.set_data(*reduced[0])
+                artist.set_marker(marker if marker and shown_all else "None")
+
+    def enable_tooltips(self, format_value=lambda x, y: f"{x:g}: {y:,.6g}"):
+        """Show the nearest point of the full data under the mouse.
+
+        The tooltip is animated, so full redraws leave it out; moving it only
+        restores the last full draw and blits the tooltip over it.
+        """
+        self.format_value = format_value
+        self.tooltip = self.ax.annotate("", xy=(0, 0), xytext=(8, 8), textcoords="offset points", fontsize=8,
+                                        bbox=dict(boxstyle="round", fc="white", alpha=0.8),
+                                        visible=False, animated=True)
+        self.hovered = None
+        # Image of the last full draw, without the tooltip
+        self.background = None
+        canvas = self.ax.figure.canvas
+        self.connections.append(canvas.mpl_connect("motion_notify_event", self.on_motion))
+        self.connections.append(canvas.mpl_connect("draw_event", self.on_draw))
+
+    def nearest(self, x, y):
+        """The full-resolution point closest to (x, y) in display space, or None."""
+        best, best_distance = None, np.inf
+        target = self.ax.transData.transform((x, y))
+        for sx, sy in self.series:
+            if not len(sx):
+                continue
+            i = np.searchsorted(sx, x)
+            for j in (max(i - 1, 0), min(i, len(sx) - 1)):
+                distance = np.hypot(*(self.ax.transData.transform((sx[j], sy[j])) - target))
+                if distance < best_distance:
+                    best, best_distance = (sx[j], sy[j]), distance
+        return best
+
+    def on_draw(self, event):
+        self.background = self.ax.figure.canvas.copy_from_bbox(self.ax.figure.bbox)
+        if self.tooltip.get_visible():
+            self.ax.draw_artist(self.tooltip)
+
+    def on_motion(self, event):
+        if event.inaxes is not self.ax:
+            if self.tooltip.get_visible():
+                self.tooltip.set_visible(False)
+                self.hovered = None
+                self.blit_tooltip()
+            return
+        point = self.nearest(event.xdata, event.ydata)
+        if point is None or point == self.hovered:
+            return
+        self.hovered = point
+        self.tooltip.xy = point
+        self.tooltip.set_text(self.format_value(*point))
+        self.tooltip.set_visible(True)
+        self.blit_tooltip()
+
+    def blit_tooltip(self):
+        canvas = self.ax.figure.canvas
+        if self.background is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self.background)
+        if self.tooltip.get_visible():
+            self.ax.draw_artist(self.tooltip)
+        canvas.blit(self.ax.figure.bbox)
+
+    def remove(self):
+        for cid in self.connections:
+            self.ax.figure.canvas.mpl_disconnect(cid)
+        self.connections = []
@@ -1,6 +1,10 @@
+import os
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 import pandas as pd
+from jobs import JobStatusBar
+from instrumentation import timed, record_dataset
+from workbooks import load_sheet, ask_sheet_and_columns
 
 def open_dataset1(parent):
     # Open file dialog to select a dataset
@@ -9,33 +13,182 @@ def open_dataset1(parent):
     if file_path:
         display_dataset(parent, file_path)
 
+def read_dataset(file_path, sheet=None, columns=None, job=None):
+    # Read the dataset (CSV or one sheet of an Excel workbook)
+    name = os.path.basename(file_path) if sheet is None else f"{os.path.basename(file_path)} [{sheet}]"
+    with timed("Explore", "load", name):
+        if file_path.endswith(".csv"):
+            df = pd.read_csv(file_path)
+        else:
+            # Streamed on first open, then read from the binary cache
+            df = load_sheet(file_path, sheet, columns, job)
+    record_dataset("Explore", name, df)
+    return df
+
+
 def display_dataset(parent, file_path):
+    if not file_path.endswith((".csv", ".xlsx")):
+        messagebox.showerror("Error", "Unsupported file format")
+        return
+
+    sheet, columns = None, None
+    if file_path.endswith(".xlsx"):
+        choice = ask_sheet_and_columns(parent, file_path)
+        if choice is None:
+            return
+        sheet, columns = choice
+
     # Create a new window to display the dataset
     data_window = tk.Toplevel(parent)  # Use the parent (main window)
     data_window.title("Dataset Viewer")
     data_window.geometry("800x500")
 
-    # Read the dataset (CSV or Excel)
-    if file_path.endswith(".csv"):
-        df = pd.read_csv(file_path)
-    elif file_path.endswith(".xlsx"):
-        df = pd.read_excel(file_path)
-    else:
-        messagebox.showerror("Error", "Unsupported file format")
-        return
+    status = JobStatusBar(data_window)
+    status.pack(side="bottom", fill="x")
+
+    # Only the rows on screen get Treeview items, so large files open instantly
+    status.run("load", lambda job: read_dataset(file_path, sheet, columns, job),
+               on_done=lambda df: VirtualTable(data_window, df),
+               message=f"Reading {os.path.basename(file_path)}...")
+
+
+class VirtualTable:
+    """Table that keeps Treeview items only for the visible rows.
+
+    Row values are read straight from the DataFrame's column arrays as the
+    user scrolls, so memory and open time do not grow with the row count.
+    """
+
+    BUFFER_ROWS = 5
+    DEFAULT_ROW_HEIGHT = 20
+    HEADING_HEIGHT = 25
+
+    def __init__(self, parent, df):
+        self.columns = [df[col].to_numpy() for col in df.columns]
+        self.row_count = len(df)
+        self.first_row = 0
+        self.visible_rows = 1
+        self.items = []
+        # Items are reused for other rows while scrolling, so the selection is kept as data row numbers
+        self.selected_rows = set()
+        # Data row the keyboard moves from
+        self.cursor_row = None
+
+        frame = ttk.Frame(parent)
+        frame.pack(expand=True, fill="both")
+
+        self.tree = ttk.Treeview(frame, columns=list(df.columns), show="headings")
+        self.scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", expand=True, fill="both")
+
+        # Set column headers
+        for col in df.columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100)
+
+        row_height = ttk.Style().lookup("Treeview", "rowheight")
+        self.row_height = int(row_height) if row_height else self.DEFAULT_ROW_HEIGHT
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_to(self.first_row - 3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_to(self.first_row + 3))
+        # The Treeview's own key bindings only know the few items it holds
+        self.tree.bind("<Up>", lambda event: self.move_cursor(-1))
+        self.tree.bind("<Down>", lambda event: self.move_cursor(1))
+        self.tree.bind("<Prior>", lambda event: self.move_cursor(-self.visible_rows))
+        self.tree.bind("<Next>", lambda event: self.move_cursor(self.visible_rows))
+        self.tree.bind("<Home>", lambda event: self.select_row(0))
+        self.tree.bind("<End>", lambda event: self.select_row(self.row_count - 1))
+
+        self.refresh()
+
+    def on_resize(self, event):
+        visible_rows = max(1, (event.height - self.HEADING_HEIGHT) // self.row_height)
+        if visible_rows == self.visible_rows and self.items:
+            return
+        self.visible_rows = visible_rows
+
+        # Keep one item per visible row plus a small buffer, never one per data row
+        wanted = min(self.row_count, visible_rows + self.BUFFER_ROWS)
+        while len(self.items) < wanted:
+            self.items.append(self.tree.insert("", "end"))
+        while len(self.items) > wanted:
+            self.tree.delete(self.items.pop())
+
+        self.scroll_to(self.first_row)
+
+    def on_scroll(self, *args):
+        # Scrollbar protocol: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.row_count))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_to(self.first_row + int(args[1]) * step)
+
+    def on_mousewheel(self, event):
+        self.scroll_to(self.first_row - int(event.delta / 120) * 3)
+        return "break"
+
+    def scroll_to(self, first_row):
+        last_start = max(0, self.row_count - self.visible_rows)
+        self.first_row = max(0, min(first_row, last_start))
+        self.refresh()
+        return "break"
+
+    def on_select(self, event=None):
+        # Rows outside the window keep their state; the visible ones follow the Treeview
+        shown = range(self.first_row, self.first_row + len(self.items))
+        self.selected_rows = {row for row in self.selected_rows if row not in shown}
+        position = {item: offset for offset, item in enumerate(self.items)}
+        self.selected_rows.update(self.first_row + position[item] for item in self.tree.selection()
+                                  if item in position and self.first_row + position[item] < self.row_count)
+        focus = self.tree.focus()
+        if focus in position and self.first_row + position[focus] < self.row_count:
+            self.cursor_row = self.first_row + position[focus]
+
+    def move_cursor(self, step):
+        if self.cursor_row is None:
+            # First key press selects the top visible row
+            return self.select_row(self.first_row)
+        return self.select_row(self.cursor_row + step)
 
-    # Create Treeview widget to display the dataset in a table
-    tree = ttk.Treeview(data_window)
-    tree["columns"] = list(df.columns)
-    tree["show"] = "headings"
+    def select_row(self, row):
+        """Select one data row, scrolling it into view."""
+        if not self.row_count:
+            return "break"
+        row = max(0, min(row, self.row_count - 1))
+        self.cursor_row = row
+        self.selected_rows = {row}
+        if row < self.first_row:
+            self.first_row = row
+        elif row >= self.first_row + self.visible_rows:
+            self.first_row = row - self.visible_rows + 1
+        self.scroll_to(self.first_row)
+        offset = row - self.first_row
+        if offset < len(self.items):
+            self.tree.focus(self.items[offset])
+        return "break"
 
-    # Set column headers
-    for col in df.columns:
-        tree.heading(col, text=col)
-        tree.column(col, width=100)
+    def row_values(self, row):
+        return [column[row] for column in self.columns]
 
-    # Insert data into the treeview (table)
-    for _, row in df.iterrows():
-        tree.insert("", "end", values=list(row))
+    @timed("Explore", "render rows")
+    def refresh(self):
+        for offset, item in enumerate(self.items):
+            row = self.first_row + offset
+            values = self.row_values(row) if row < self.row_count else ()
+            self.tree.item(item, values=values)
+        selected = [item for offset, item in enumerate(self.items) if self.first_row + offset in self.selected_rows]
+        if set(selected) != set(self.tree.selection()):
+            self.tree.selection_set(selected)
+        self.tree.yview_moveto(0)
 
-    tree.pack(expand=True, fill="both")
\ No newline at end of file
+        if self.row_count:
+            top = self.first_row / self.row_count
+            bottom = min(1.0, (self.first_row + self.visible_rows) / self.row_count)
+            self.scrollbar.set(top, bottom)
+        else:
+            self.scrollbar.set(0, 1)
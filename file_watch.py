@@ -0,0 +1,241 @@
+import csv
+import io
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from dataset_cache import compact_column
+
+# How often open windows check their data files
+POLL_MS = 2000
+# Bytes before the last read position that must be unchanged for a change to count as an append
+TAIL_BYTES = 256
+
+
+class Change:
+    """What happened to a watched file since the last check.
+
+    ``kind`` is "rows" (``data`` holds the appended CSV lines), "columns"
+    (``columns`` lists header names added at the end) or "reload" (anything
+    else; the file has to be read again).
+    """
+
+    def __init__(self, kind, data=b"", columns=()):
+        self.kind = kind
+        self.data = data
+        self.columns = list(columns)
+
+    def __repr__(self):
+        return f"Change({self.kind!r}, {len(self.data)} bytes, columns={self.columns})"
+
+
+class FileWatcher:
+    """Detects appended rows and added columns in a CSV by polling its size and mtime.
+
+    Only the bytes after the last complete line seen so far are read, so the
+    cost of a check follows the size of the change, not of the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.force_reload = False
+        self.snapshot()
+
+    def snapshot(self):
+        """Take the file as it is now as the baseline for later checks."""
+        stat = os.stat(self.path)
+        self.signature = (stat.st_size, stat.st_mtime_ns)
+        with open(self.path, "rb") as f:
+            self.header = f.readline()
+            # A last line without its newline may still be being written
+            self.offset = self.complete_end(f, stat.st_size)
+            self.tail = self.read_tail(f, self.offset)
+
+    def confirm(self):
+        """Call once the data read after ``snapshot`` is in memory.
+
+        If the file changed in between, the loaded data may already contain
+        part of the change, so the next check asks for a full reload.
+        """
+        stat = os.stat(self.path)
+        if (stat.st_size, stat.st_mtime_ns) != self.signature:
+            self.force_reload = True
+
+    def columns(self, header=None):
+        line = (self.header if header is None else header).decode("utf-8-sig", errors="replace")
+        return next(csv.reader([line]), [])
+
+    def check(self):
+        """The Change since the last check, or None if there is nothing new."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) == self.signature and not self.force_reload:
+            return None
+
+        if self.force_reload:
+            self.force_reload = False
+            self.snapshot()
+            return Change("reload")
+
+        with open(self.path, "rb") as f:
+            header = f.readline()
+            if header != self.header:
+                old, new = self.columns(), self.columns(header)
+                self.snapshot()
+                if len(new) > len(old) and new[:len(old)] == old:
+                    return Change("columns", columns=new[len(old):])
+                return Change("reload")
+
+            if stat.st_size < self.offset or self.read_tail(f, self.offset) != self.tail:
+                # Truncated or rewritten rather than appended to
+                self.snapshot()
+                return Change("reload")
+
+            end = self.complete_end(f, stat.st_size)
+            f.seek(self.offset)
+            data = f.read(end - self.offset)
+            self.signature = (stat.st_size, stat.st_mtime_ns)
+            if not data:
+                return None
+            self.offset = end
+            self.tail = self.read_tail(f, end)
+            return Change("rows", data=data)
+
+    def start(self, widget, on_change, interval_ms=POLL_MS):
+        """Poll on ``widget``'s event loop and call ``on_change(change)`` until it is destroyed.
+
+        If an appended change cannot be merged (malformed rows, values the
+        window cannot index), ``on_change`` is called again with a "reload".
+        """
+        def poll():
+            if not widget.winfo_exists():
+                return
+            try:
+                change = self.check()
+                if change is not None:
+                    try:
+                        on_change(change)
+                    except Exception:
+                        if change.kind == "reload":
+                            raise
+                        on_change(Change("reload"))
+            finally:
+                # An error is reported by Tk, but never stops the watching
+                widget.after(interval_ms, poll)
+
+        widget.after(interval_ms, poll)
+        return self
+
+    def complete_end(self, f, size):
+        # Offset just past the last newline, found by scanning back from the end
+        position = size
+        while position > 0:
+            start = max(0, position - 4096)
+            f.seek(start)
+            block = f.read(position - start)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+        return 0
+
+    def read_tail(self, f, end):
+        f.seek(max(0, end - TAIL_BYTES))
+        return f.read(min(end, TAIL_BYTES))
+
+
+class WatchedDataset:
+    """A data file loaded on a window's job status bar and kept in step with the file on disk.
+
+    ``load(path)`` reads the file on a job thread. When the watcher sees
+    appended rows or columns, ``merge(change, data)`` is called on the Tk
+    thread and returns the updated data, or None if the file has to be read
+    again. Every new
+    version is passed to ``on_update(data)``; ``version`` changes with it,
+    so cached views of an older copy of the file are never reused.
+    """
+
+    def __init__(self, widget, status, name, locate, load, merge, on_update):
+        self.widget = widget
+        self.status = status
+        self.name = name
+        # Called on the job thread, so finding the file never blocks the window
+        self.locate = locate
+        self.load = load
+        self.merge = merge
+        self.on_update = on_update
+        self.watcher = None
+        self.data = None
+        self.version = None
+
+    def start(self):
+        self.status.run("load", lambda job: self.read(), on_done=self.on_loaded, message=f"Loading {self.name}...")
+        return self
+
+    def read(self):
+        # After the first load the watcher has already recorded the file's new state
+        watcher = self.watcher or FileWatcher(self.locate())
+        data = self.load(watcher.path)
+        watcher.confirm()
+        return data, watcher
+
+    def on_loaded(self, result):
+        data, watcher = result
+        if self.watcher is None:
+            self.watcher = watcher.start(self.widget, self.on_change)
+        self.update(data)
+
+    def on_change(self, change):
+        data = None if change.kind == "reload" else self.merge(change, self.data)
+        if data is None:
+            self.status.run("load", lambda job: self.read(), on_done=self.on_loaded,
+                            message=f"Reloading {self.name}...")
+            return
+        self.update(data)
+
+    def update(self, data):
+        self.data = data
+        self.version = (self.watcher.path, *self.watcher.signature)
+        self.on_update(data)
+
+    def columns(self):
+        """Header names of the file as last seen by the watcher."""
+        return self.watcher.columns()
+
+
+def parse_rows(data, columns, **read_csv_kwargs):
+    """Appended CSV lines as a frame with the file's columns.
+
+    Raises ValueError if a line does not have one field per column, since
+    pandas would otherwise shift the fields into the wrong columns.
+    """
+    lines = io.StringIO(data.decode("utf-8", errors="replace"), newline="")
+    for number, fields in enumerate(csv.reader(lines), 1):
+        if fields and len(fields) != len(columns):
+            raise ValueError(f"Appended line {number} has {len(fields)} fields, expected {len(columns)}")
+    return pd.read_csv(io.BytesIO(data), header=None, names=columns, index_col=False, **read_csv_kwargs)
+
+
+def append_frame(df, rows):
+    """``df`` with ``rows`` added below, keeping categorical and compact columns as they are.
+
+    Nothing is parsed again; existing columns are only copied once.
+    """
+    columns = {}
+    for name in df.columns:
+        old = df[name]
+        new = rows[name] if name in rows else pd.Series(np.nan, index=rows.index)
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            # New names are added as categories; existing codes stay valid
+            columns[name] = union_categoricals([old.array, pd.Categorical(new.astype(old.cat.categories.dtype))])
+        elif old.dtype.kind in "biuf":
+            # numpy widens the dtype only if the new values need it
+            new_values = compact_column(pd.to_numeric(new, errors="coerce")).to_numpy()
+            columns[name] = np.concatenate([old.to_numpy(), new_values])
+        else:
+            columns[name] = np.concatenate([old.to_numpy(dtype=object), new.to_numpy(dtype=object)])
+    return pd.DataFrame(columns, columns=df.columns)
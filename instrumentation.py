@@ -0,0 +1,241 @@
+import json
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Most recent timings and stalls kept for the Performance window and exports
+MAX_EVENTS = 500
+# The stall monitor wakes up this often...
+MONITOR_INTERVAL_MS = 100
+# ...and a wake-up this much later than scheduled counts as a stall
+STALL_THRESHOLD_MS = 100
+
+
+class Recorder:
+    """Timings per (window, stage), memory per loaded dataset and Tk stalls.
+
+    Safe to call from job threads; totals are kept for every stage, and only
+    the last MAX_EVENTS individual timings and stalls are retained.
+    """
+
+    def __init__(self, max_events=MAX_EVENTS):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.events = deque(maxlen=max_events)
+        self.stalls = deque(maxlen=max_events)
+        self.stages = {}
+        self.datasets = {}
+
+    def record(self, window, stage, seconds, detail=""):
+        with self.lock:
+            self.events.append({
+                "time": time.time(),
+                "window": window,
+                "stage": stage,
+                "ms": seconds * 1000,
+                "detail": detail,
+                "thread": threading.current_thread().name,
+            })
+            stats = self.stages.setdefault((window, stage), {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += seconds * 1000
+            stats["max_ms"] = max(stats["max_ms"], seconds * 1000)
+            stats["last_ms"] = seconds * 1000
+
+    @contextmanager
+    def timed(self, window, stage, detail=""):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(window, stage, time.perf_counter() - start, detail)
+
+    def record_dataset(self, window, name, data):
+        with self.lock:
+            self.datasets[(window, name)] = {
+                "time": time.time(),
+                "bytes": dataset_bytes(data),
+                "rows": len(data) if hasattr(data, "__len__") else None,
+            }
+
+    def record_stall(self, ms):
+        with self.lock:
+            self.stalls.append({"time": time.time(), "ms": ms})
+
+    def reset(self):
+        with self.lock:
+            self.events.clear()
+            self.stalls.clear()
+            self.stages.clear()
+            self.datasets.clear()
+
+    def snapshot(self):
+        """Everything recorded so far, as plain JSON-ready data."""
+        with self.lock:
+            return {
+                "started": self.started,
+                "exported": time.time(),
+                "stages": [
+                    {"window": window, "stage": stage, **stats, "mean_ms": stats["total_ms"] / stats["count"]}
+                    for (window, stage), stats in self.stages.items()
+                ],
+                "datasets": [{"window": window, "name": name, **info}
+                             for (window, name), info in self.datasets.items()],
+                "stalls": list(self.stalls),
+                "events": list(self.events),
+            }
+
+    def export(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+
+def dataset_bytes(data):
+    """Approximate memory held by a loaded dataset."""
+    if hasattr(data, "memory_usage"):
+        # DataFrame; deep counts the Python strings in object columns
+        return int(data.memory_usage(deep=True).sum())
+    if hasattr(data, "nbytes"):
+        return int(data.nbytes)
+    values = getattr(data, "values", None)
+    if hasattr(values, "nbytes"):
+        # WideTable / Panel: the dense value array dominates
+        return int(values.nbytes)
+    return sys.getsizeof(data)
+
+
+recorder = Recorder()
+
+
+def timed(window, stage, detail=""):
+    """Time a block (or, as a decorator, every call of a function) under ``window``/``stage``."""
+    return recorder.timed(window, stage, detail)
+
+
+def record_dataset(window, name, data):
+    recorder.record_dataset(window, name, data)
+
+
+class StallMonitor:
+    """Measures how late the Tk event loop runs a timer callback.
+
+    Anything that blocks the main loop (a slow handler, a big redraw) delays
+    the next wake-up, so the lateness is how long the UI was frozen.
+    """
+
+    def __init__(self, root, interval_ms=MONITOR_INTERVAL_MS, threshold_ms=STALL_THRESHOLD_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.expected = None
+        self.schedule()
+
+    def schedule(self):
+        self.expected = time.perf_counter() + self.interval_ms / 1000
+        self.root.after(self.interval_ms, self.tick)
+
+    def tick(self):
+        late_ms = (time.perf_counter() - self.expected) * 1000
+        if late_ms >= self.threshold_ms:
+            recorder.record_stall(late_ms)
+        self.schedule()
+
+
+def start_stall_monitor(root):
+    """Start monitoring ``root``'s event loop once; every Toplevel shares it."""
+    if not hasattr(root, "_stall_monitor"):
+        root._stall_monitor = StallMonitor(root)
+    return root._stall_monitor
+
+
+class PerformanceWindow:
+    """Live view of the recorder: stage timings, dataset memory and UI stalls."""
+
+    REFRESH_MS = 1000
+
+    def __init__(self, parent):
+        import tkinter as tk
+        from tkinter import ttk
+
+        self.window = tk.Toplevel(parent)
+        self.window.title("Performance")
+        self.window.geometry("760x560")
+
+        buttons = ttk.Frame(self.window)
+        buttons.pack(side="bottom", fill="x", padx=5, pady=5)
+        ttk.Button(buttons, text="Export JSON...", command=self.export).pack(side="right")
+        ttk.Button(buttons, text="Reset", command=self.reset).pack(side="right", padx=5)
+        self.stall_label = ttk.Label(buttons, text="")
+        self.stall_label.pack(side="left")
+
+        ttk.Label(self.window, text="Stages (slowest first)").pack(anchor="w", padx=5)
+        self.stage_tree = self.make_tree(["window", "stage", "count", "mean ms", "max ms", "last ms"], height=10)
+        ttk.Label(self.window, text="Loaded datasets").pack(anchor="w", padx=5)
+        self.dataset_tree = self.make_tree(["window", "dataset", "rows", "memory MB"], height=5)
+        ttk.Label(self.window, text="Recent calls").pack(anchor="w", padx=5)
+        self.event_tree = self.make_tree(["time", "window", "stage", "ms", "detail"], height=8)
+
+        self.refresh()
+
+    def refresh(self):
+        if not self.window.winfo_exists():
+            return
+        self.update_view()
+        self.window.after(self.REFRESH_MS, self.refresh)
+
+    def make_tree(self, columns, height):
+        from tkinter import ttk
+        tree = ttk.Treeview(self.window, columns=columns, show="headings", height=height)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=110, anchor="w" if col in ("window", "stage", "dataset", "detail") else "e")
+        tree.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+        return tree
+
+    def update_view(self):
+        snapshot = recorder.snapshot()
+
+        stages = sorted(snapshot["stages"], key=lambda s: s["max_ms"], reverse=True)
+        self.fill(self.stage_tree, [
+            (s["window"], s["stage"], s["count"], f"{s['mean_ms']:.1f}", f"{s['max_ms']:.1f}", f"{s['last_ms']:.1f}")
+            for s in stages
+        ])
+        self.fill(self.dataset_tree, [
+            (d["window"], d["name"], "" if d["rows"] is None else d["rows"], f"{d['bytes'] / 2**20:.2f}")
+            for d in snapshot["datasets"]
+        ])
+        self.fill(self.event_tree, [
+            (time.strftime("%H:%M:%S", time.localtime(e["time"])), e["window"], e["stage"], f"{e['ms']:.1f}", e["detail"])
+            for e in reversed(snapshot["events"][-50:])
+        ])
+
+        stalls = snapshot["stalls"]
+        longest = max((s["ms"] for s in stalls), default=0)
+        from chart_cache import get_chart_cache
+        cache = get_chart_cache().stats()
+        self.stall_label.configure(
+            text=f"UI stalls over {STALL_THRESHOLD_MS} ms: {len(stalls)}   longest: {longest:.0f} ms   "
+                 f"Chart cache: {cache['hits']} hits / {cache['misses']} misses, {cache['bytes'] / 2**20:.1f} MB"
+        )
+
+    def fill(self, tree, rows):
+        tree.delete(*tree.get_children())
+        for row in rows:
+            tree.insert("", "end", values=row)
+
+    def reset(self):
+        recorder.reset()
+        self.update_view()
+
+    def export(self):
+        from tkinter import filedialog, messagebox
+        path = filedialog.asksaveasfilename(parent=self.window, title="Export Performance Data",
+                                            defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+        if not path:
+            return
+        try:
+            recorder.export(path)
+        except OSError as e:
+            messagebox.showerror("Export Failed", str(e), parent=self.window)
@@ -0,0 +1,194 @@
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk, messagebox
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once it has been cancelled or superseded."""
+
+
+class Job:
+    """Handle given to a running job for progress reports and cancellation checks."""
+
+    def __init__(self, scheduler, key, owner, on_done, on_error, on_progress):
+        self.key = key
+        self.owner = owner
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.future = None
+        self._scheduler = scheduler
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def check(self):
+        """Stop the job here if it is no longer wanted."""
+        if self.cancelled:
+            raise JobCancelled()
+
+    def report(self, fraction, message=""):
+        """Send progress to the UI. ``fraction`` is 0..1, or None if unknown."""
+        self.check()
+        self._scheduler.post(self, "progress", (fraction, message))
+
+
+class JobScheduler:
+    """Runs jobs on a shared thread pool and delivers results on the Tk thread.
+
+    Worker threads never touch Tk: they put results on a queue which the main
+    loop drains via ``root.after``. A new job for the same owner widget and
+    name supersedes the previous one, whose result is then dropped.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, root, max_workers=4):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.results = queue.Queue()
+        self.active = {}
+        self.root.after(self.POLL_MS, self.poll)
+
+    def submit(self, owner, name, fn, *args, on_done=None, on_error=None, on_progress=None):
+        """Run ``fn(job, *args)`` in the background on behalf of ``owner``."""
+        key = (str(owner), name)
+        self.cancel(key)
+
+        job = Job(self, key, owner, on_done, on_error, on_progress)
+        self.active[key] = job
+        job.future = self.executor.submit(self.run, job, fn, args)
+        return job
+
+    def cancel(self, key):
+        job = self.active.pop(key, None)
+        if job is not None:
+            job.cancel()
+
+    def run(self, job, fn, args):
+        # Runs on a worker thread
+        try:
+            result = fn(job, *args)
+        except JobCancelled:
+            return
+        except Exception as e:
+            self.post(job, "error", e)
+        else:
+            self.post(job, "done", result)
+
+    def post(self, job, kind, payload):
+        self.results.put((job, kind, payload))
+
+    def poll(self):
+        try:
+            while True:
+                try:
+                    job, kind, payload = self.results.get_nowait()
+                except queue.Empty:
+                    break
+
+                # Drop results of cancelled or superseded jobs and of closed windows
+                if job.cancelled or self.active.get(job.key) is not job:
+                    continue
+                if not job.owner.winfo_exists():
+                    self.active.pop(job.key, None)
+                    continue
+
+                if kind == "progress":
+                    self.deliver(job.on_progress, *payload)
+                    continue
+
+                del self.active[job.key]
+                self.deliver(job.on_done if kind == "done" else job.on_error, payload)
+        finally:
+            # One window's failing callback must not stop results for every other window
+            self.root.after(self.POLL_MS, self.poll)
+
+    def deliver(self, callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception:
+            self.root.report_callback_exception(*sys.exc_info())
+
+
+def get_scheduler(widget):
+    """The scheduler shared by every window of the application."""
+    root = widget.nametowidget(".")
+    if not hasattr(root, "_job_scheduler"):
+        root._job_scheduler = JobScheduler(root)
+    return root._job_scheduler
+
+
+class JobStatusBar(ttk.Frame):
+    """Progress bar, status text and Cancel button for a window's background jobs."""
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.scheduler = get_scheduler(parent)
+        self.job = None
+
+        self.progress = ttk.Progressbar(self, length=150, maximum=1.0)
+        self.progress.pack(side="left", padx=5)
+        self.label = ttk.Label(self, text="")
+        self.label.pack(side="left", fill="x", expand=True)
+        self.cancel_button = ttk.Button(self, text="Cancel", command=self.cancel, state="disabled")
+        self.cancel_button.pack(side="right", padx=5)
+
+    def run(self, name, fn, *args, on_done=None, on_error=None, message="Working..."):
+        """Submit ``fn(job, *args)`` for this window and show its progress here."""
+        self.start(message)
+        self.job = self.scheduler.submit(
+            self.winfo_toplevel(), name, fn, *args,
+            on_done=lambda result: self.finish(on_done, result),
+            on_error=lambda error: self.fail(on_error, error),
+            on_progress=self.update_progress,
+        )
+        return self.job
+
+    def start(self, message):
+        self.progress.configure(mode="indeterminate")
+        self.progress.start(15)
+        self.label.configure(text=message)
+        self.cancel_button.configure(state="normal")
+
+    def update_progress(self, fraction, message=""):
+        if fraction is not None:
+            self.progress.stop()
+            self.progress.configure(mode="determinate", value=fraction)
+        if message:
+            self.label.configure(text=message)
+
+    def stop(self, message=""):
+        self.job = None
+        self.progress.stop()
+        self.progress.configure(mode="determinate", value=0)
+        self.label.configure(text=message)
+        self.cancel_button.configure(state="disabled")
+
+    def finish(self, callback, result):
+        self.stop()
+        if callback:
+            callback(result)
+
+    def fail(self, callback, error):
+        self.stop(f"Failed: {error}")
+        if callback:
+            callback(error)
+        else:
+            messagebox.showerror("Error", str(error), parent=self.winfo_toplevel())
+
+    def cancel(self):
+        if self.job is not None:
+            self.scheduler.cancel(self.job.key)
+        self.stop("Cancelled")
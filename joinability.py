@@ -0,0 +1,152 @@
+import os
+import re
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from workbooks import iter_sheet_chunks
+
+# Hashes kept per column; the estimate error is roughly 1 / sqrt(SKETCH_SIZE)
+SKETCH_SIZE = 256
+CHUNK_ROWS = 100_000
+# Columns with fewer distinct values (e.g. "Status") are not useful join keys
+MIN_DISTINCT_VALUES = 10
+# Pairs below this containment are not reported as joinable
+MIN_CONTAINMENT = 0.3
+# Integer columns only count as keys if their name says so; otherwise small
+# counts like "infant deaths" overlap with everything
+KEY_NAME_HINTS = {"id", "code", "key", "year", "iso", "iso3"}
+
+
+class KeySketch:
+    """Bottom-k (KMV) sketch of the distinct values of one column.
+
+    Only the k smallest 64-bit value hashes are kept. That is enough to
+    estimate the number of distinct values, and the Jaccard similarity and
+    containment between two columns, without materialising either of them.
+    """
+
+    def __init__(self, k=SKETCH_SIZE):
+        self.k = k
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, values):
+        hashes = np.unique(hash_values(values))
+        self.hashes = np.union1d(self.hashes, hashes[:self.k])[:self.k]
+
+    def distinct_count(self):
+        if len(self.hashes) < self.k:
+            return len(self.hashes)
+        # The k-th smallest of n uniform hashes sits near k / n of the range
+        return (self.k - 1) / (float(self.hashes[-1]) / 2.0 ** 64)
+
+    def jaccard(self, other):
+        k = min(self.k, other.k)
+        union = np.union1d(self.hashes, other.hashes)[:k]
+        if len(union) == 0:
+            return 0.0
+        in_both = np.isin(union, self.hashes) & np.isin(union, other.hashes)
+        return in_both.sum() / len(union)
+
+    def containment(self, other):
+        """Estimated fraction of this column's values that also occur in ``other``."""
+        count = self.distinct_count()
+        if count == 0:
+            return 0.0
+        return min(1.0, self.shared_count(other) / count)
+
+    def shared_count(self, other):
+        jaccard = self.jaccard(other)
+        return jaccard / (1 + jaccard) * (self.distinct_count() + other.distinct_count())
+
+
+def normalize_values(values):
+    """Canonical text form of key values so "Albania " and "albania" match."""
+    series = pd.Series(values).dropna()
+    if series.dtype.kind == "f":
+        series = series[series == np.floor(series)].astype(np.int64)
+    return series.astype(str).str.strip().str.casefold()
+
+
+def hash_values(values):
+    normalized = normalize_values(values)
+    return pd.util.hash_array(normalized.to_numpy(dtype=object))
+
+
+def is_key_like(name, series):
+    """Text columns and integer id/code/year columns can be join keys."""
+    named_like_key = bool(KEY_NAME_HINTS & set(re.split(r"[^a-z0-9]+", name.lower())))
+    if series.dtype.kind in "iub":
+        return named_like_key
+    if series.dtype.kind == "f":
+        return False
+
+    # Text columns that are really numbers (e.g. ".." placeholders in World Bank
+    # files) are treated like numeric columns
+    sample = series.dropna().head(1000)
+    if pd.to_numeric(sample, errors="coerce").notna().mean() > 0.5:
+        return named_like_key
+    return True
+
+
+def read_chunks(path):
+    if path.endswith(".csv"):
+        yield from pd.read_csv(path, chunksize=CHUNK_ROWS)
+    elif path.endswith(".xlsx"):
+        yield from iter_sheet_chunks(path, chunk_rows=CHUNK_ROWS)
+
+
+def sketch_file(path, job=None):
+    """Sketch every key-like column of a file in one streaming pass."""
+    sketches = {}
+    candidates = None
+
+    for chunk in read_chunks(path):
+        if job is not None:
+            job.check()
+        chunk.columns = chunk.columns.astype(str).str.strip()
+        if candidates is None:
+            candidates = [col for col in chunk.columns if is_key_like(col, chunk[col])]
+        for col in candidates:
+            sketches.setdefault(col, KeySketch()).update(chunk[col])
+
+    return {
+        col: sketch for col, sketch in sketches.items()
+        if sketch.distinct_count() >= MIN_DISTINCT_VALUES
+    }
+
+
+def find_join_keys(file_paths, job=None):
+    """Best join key for each pair of files, estimated from value sketches.
+
+    Returns a list of match dicts (best first) and the files with no match.
+    """
+    sketches = {}
+    for i, path in enumerate(file_paths):
+        if job is not None:
+            job.report(i / len(file_paths), f"Sketching {os.path.basename(path)}...")
+        sketches[path] = sketch_file(path, job)
+
+    matches = []
+    for file_a, file_b in combinations(file_paths, 2):
+        best = None
+        for col_a, sketch_a in sketches[file_a].items():
+            for col_b, sketch_b in sketches[file_b].items():
+                # Containment of the smaller side is what a join would keep
+                containment = max(sketch_a.containment(sketch_b), sketch_b.containment(sketch_a))
+                if best is None or containment > best["containment"]:
+                    best = {
+                        "files": (file_a, file_b),
+                        "columns": (col_a, col_b),
+                        "containment": containment,
+                        "jaccard": sketch_a.jaccard(sketch_b),
+                        "shared_values": sketch_a.shared_count(sketch_b),
+                    }
+        if best is not None and best["containment"] >= MIN_CONTAINMENT:
+            matches.append(best)
+
+    matches.sort(key=lambda match: match["containment"], reverse=True)
+    matched = {file for match in matches for file in match["files"]}
+    unmatched = [path for path in file_paths if path not in matched]
+    return matches, unmatched
@@ -1,8 +1,109 @@
+import copy
 import tkinter as tk
 from tkinter import ttk
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from dataset_cache import load_csv
+from jobs import JobStatusBar
+from registry import require_dataset
+from countries import get_country_index
+from search_index import SubstringIndex
+from instrumentation import timed, record_dataset
+from chart_cache import get_chart_cache, region_bytes
+from file_watch import WatchedDataset, parse_rows, append_frame
+
+class YearIndex:
+    """Per-year row positions, country lists and life-expectancy orderings.
+
+    Built once when the data loads, so changing the year, sort order or
+    search text only slices precomputed arrays.
+    """
+
+    def __init__(self, df, country_index=None):
+        years = df["Year"].to_numpy()
+        life = df["Life expectancy"].to_numpy(dtype=float)
+        countries = df["Country"].to_numpy(dtype=object)
+
+        # Group row positions by year with one sort instead of a mask per year
+        order = np.argsort(years, kind="stable")
+        unique_years, starts = np.unique(years[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+
+        self.rows = {}
+        self.ascending = {}
+        self.descending = {}
+        self.countries = {}
+        self.search = {}
+        for year, start, end in zip(unique_years.tolist(), starts, ends):
+            rows = order[start:end]
+            self.index_year(year, rows, life[rows], countries[rows])
+
+        # Lets searches for other spellings ("Russia", "USA") find this file's names
+        self.country_index = country_index
+        self.name_by_id = {}
+        if country_index is not None:
+            names = pd.unique(df["Country"].dropna())
+            self.name_by_id = dict(zip(country_index.ids_of(names).tolist(), names))
+
+    def index_year(self, year, rows, life, countries):
+        order = np.argsort(life, kind="stable")
+        by_life = rows[order]
+        # NaN sorts last either way, as with DataFrame.sort_values
+        valid = ~np.isnan(life[order])
+        self.rows[year] = rows
+        self.ascending[year] = by_life
+        self.descending[year] = np.concatenate([by_life[valid][::-1], by_life[~valid]])
+        # Rows with no country name are left out of the country list
+        self.countries[year] = sorted({country for country in countries if isinstance(country, str)})
+        self.search[year] = SubstringIndex(self.countries[year])
+
+    def updated(self, df, new_rows):
+        """Index of ``df`` after the rows at positions ``new_rows`` were appended.
+
+        Only the years those rows belong to are indexed again; every other
+        year shares its arrays with this index, which is left unchanged.
+        """
+        index = copy.copy(self)
+        for name in ["rows", "ascending", "descending", "countries", "search", "name_by_id"]:
+            setattr(index, name, dict(getattr(self, name)))
+
+        years = df["Year"].to_numpy()[new_rows]
+        life = df["Life expectancy"]
+        countries = df["Country"]
+        empty = np.empty(0, dtype=np.intp)
+        for year in np.unique(years).tolist():
+            rows = np.concatenate([self.rows.get(year, empty), new_rows[years == year]])
+            index.index_year(year, rows, life.iloc[rows].to_numpy(dtype=float),
+                             countries.iloc[rows].to_numpy(dtype=object))
+
+        if self.country_index is not None:
+            names = pd.unique(countries.iloc[new_rows].dropna())
+            for country_id, name in zip(self.country_index.ids_of(names).tolist(), names):
+                index.name_by_id.setdefault(country_id, name)
+        return index
+
+    def positions(self, year, sort_mode):
+        empty = np.empty(0, dtype=np.intp)
+        # "Highest to Lowest" is ascending because barh draws the first row at the bottom
+        if sort_mode == "Highest to Lowest":
+            return self.ascending.get(year, empty)
+        if sort_mode == "Lowest to Highest":
+            return self.descending.get(year, empty)
+        return self.rows.get(year, empty)
+
+    def matching_countries(self, year, search_text):
+        if year not in self.search:
+            return []
+        index = self.search[year]
+        matches = [index.options[i] for i in index.search(search_text)]
+        if not matches and search_text and self.country_index is not None:
+            name = self.name_by_id.get(self.country_index.id_of(search_text))
+            if name in index.options:
+                matches = [name]
+        return matches
+
 
 class life_expectancy_app:
     def __init__(self, root):
@@ -10,12 +111,57 @@ class life_expectancy_app:
         self.root.title("Life Expectancy Dashboard")
         self.root.geometry("1000x500")
 
-        self.df = pd.read_csv("life.csv")
-        self.df.columns = self.df.columns.str.strip()
-        self.years = sorted(self.df["Year"].unique())
+        self.df = None
+        self.index = None
+        self.chart = None
+        self.last_view = None
+        self.years = []
 
         self.build_gui()
+
+        # Load in the background so the dashboard opens immediately; rows appended
+        # to life.csv while the window is open are merged in place
+        self.dataset = WatchedDataset(self.root, self.status, "life.csv", lambda: require_dataset("life.csv"),
+                                      self.load_data, self.merge_rows, self.on_data_loaded).start()
+
+    def load_data(self, path):
+        with timed("Life Expectancy", "load"):
+            # Categorical names and float32/int16 numbers take a fraction of the memory
+            df = load_csv(path, compact=True)
+            df.columns = df.columns.str.strip()
+        with timed("Life Expectancy", "index"):
+            index = YearIndex(df, get_country_index())
+        return df, index
+
+    def merge_rows(self, change, data):
+        if change.kind != "rows":
+            # New columns: read the file again
+            return None
+        df, index = data
+        with timed("Life Expectancy", "append", f"{len(change.data)} bytes"):
+            rows = parse_rows(change.data, self.dataset.columns())
+            rows.columns = rows.columns.str.strip()
+            appended = append_frame(df, rows)
+            return appended, index.updated(appended, np.arange(len(df), len(appended)))
+
+    def on_data_loaded(self, data):
+        # A filter still running on the old frame is cancelled and redone on the new one
+        redo_filter = self.df is not None and self.status.job is not None and self.status.job.key[1] == "filter"
+        if redo_filter:
+            self.status.cancel()
+        self.df, self.index = data
+        record_dataset("Life Expectancy", "life.csv", self.df)
+        self.refresh_views(redo_filter)
+
+    def refresh_views(self, redo_filter=False):
+        self.years = sorted(self.index.rows)
+        if not self.year_var.get() or int(self.year_var.get()) not in self.index.rows:
+            self.year_var.set(str(self.years[-1]))
+        self.year_combo.configure(values=self.years)
         self.update_country_list()
+        chart_open = self.chart is not None and self.chart.window.winfo_viewable()
+        if self.last_view is not None and (redo_filter or chart_open):
+            self.show_view(*self.last_view)
 
     def build_gui(self):
         tk.Label(self.root, text="Life Expectancy Dashboard", font=("Arial", 18)).pack(pady=10)
@@ -23,12 +169,13 @@ class life_expectancy_app:
         controls = tk.Frame(self.root)
         controls.pack(pady=5)
 
-        self.year_var = tk.StringVar(value=str(self.years[-1]))
+        self.year_var = tk.StringVar()
         self.sort_var = tk.StringVar(value="Highest to Lowest")
         self.search_var = tk.StringVar()
 
         tk.Label(controls, text="Year:").grid(row=0, column=0, padx=5)
-        ttk.Combobox(controls, textvariable=self.year_var, values=self.years, width=8).grid(row=0, column=1)
+        self.year_combo = ttk.Combobox(controls, textvariable=self.year_var, values=self.years, width=8)
+        self.year_combo.grid(row=0, column=1)
 
         tk.Label(controls, text="Sort:").grid(row=0, column=2, padx=5)
         ttk.Combobox(
@@ -49,72 +196,191 @@ class life_expectancy_app:
         tk.Button(self.root, text="Show All Countries", command=self.show_all).pack(pady=3)
         tk.Button(self.root, text="Show Selected Countries", command=self.show_selected).pack(pady=3)
 
-    def get_filtered_data(self):
-        year = int(self.year_var.get())
-        filtered = self.df[self.df["Year"] == year]
-        sort_mode = self.sort_var.get()
-
-        if sort_mode == "Highest to Lowest":
-            filtered = filtered.sort_values("Life expectancy", ascending=True)
-        elif sort_mode == "Lowest to Highest":
-            filtered = filtered.sort_values("Life expectancy", ascending=False)
+        self.status = JobStatusBar(self.root)
+        self.status.pack(fill="x", side="bottom", pady=3)
 
-        return filtered
+    def get_filtered_data(self, year=None, sort_mode=None):
+        # Background jobs pass the Tk variable values in, since only the Tk thread may read them
+        if year is None:
+            year = int(self.year_var.get())
+        if sort_mode is None:
+            sort_mode = self.sort_var.get()
+        with timed("Life Expectancy", "sort", f"{year}, {sort_mode}"):
+            return self.df.iloc[self.index.positions(year, sort_mode)]
 
     def update_country_list(self, event=None):
-        self.country_listbox.delete(0, tk.END)
+        if self.df is None:
+            return
         year = int(self.year_var.get())
-        countries = self.df[self.df["Year"] == year]["Country"].unique()
         search_text = self.search_var.get().lower()
 
-        for c in sorted(countries):
-            if search_text in c.lower():
-                self.country_listbox.insert(tk.END, c)
+        with timed("Life Expectancy", "filter", search_text):
+            self.country_listbox.delete(0, tk.END)
+            countries = self.index.matching_countries(year, search_text)
+            if countries:
+                self.country_listbox.insert(tk.END, *countries)
 
     def show_all(self):
-        self.show_graph(self.get_filtered_data(), "Life Expectancy by Country")
+        if self.df is None:
+            return
+        self.show_view(int(self.year_var.get()), self.sort_var.get())
 
     def show_selected(self):
         selected = self.country_listbox.curselection()
-        if not selected:
+        if not selected or self.df is None:
             return
-        names = [self.country_listbox.get(i) for i in selected]
-        data = self.get_filtered_data()
-        self.show_graph(data[data["Country"].isin(names)], "Selected Countries")
+        names = tuple(self.country_listbox.get(i) for i in selected)
+        self.show_view(int(self.year_var.get()), self.sort_var.get(), names)
+
+    def show_view(self, year, sort_mode, names=None):
+        # Remembered so the chart can be redrawn when the file changes
+        self.last_view = (year, sort_mode, names)
+        title = "Life Expectancy by Country" if names is None else "Selected Countries"
+
+        def filter_view(job):
+            data = self.get_filtered_data(year, sort_mode)
+            return data if names is None else data[data["Country"].isin(names)]
 
-    def show_graph(self, data, title):
+        # show_all and show_selected share the "filter" slot, so the latest click wins
+        self.status.run("filter", filter_view,
+                        on_done=lambda data: self.show_graph(data, title, (year, sort_mode, names)))
+
+    def show_graph(self, data, title, view=None):
         if data.empty:
             return
 
-        graph_window = tk.Toplevel(self.root)
-        graph_window.title(title)
-        graph_window.geometry("900x600")
-
-        graph_canvas = tk.Canvas(graph_window)
-        scrollbar = ttk.Scrollbar(graph_window, orient="vertical", command=graph_canvas.yview)
-        scrollable_frame = tk.Frame(graph_canvas)
-
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: graph_canvas.configure(scrollregion=graph_canvas.bbox("all"))
-        )
-
-        graph_canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        graph_canvas.configure(yscrollcommand=scrollbar.set)
-        graph_canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        height = max(6, len(data) * 0.25)
-        fig, ax = plt.subplots(figsize=(10, height))
-        ax.barh(data["Country"], data["Life expectancy"])
-        ax.set_title(title)
-        ax.tick_params(axis='y', labelsize=7)
-        plt.tight_layout()
-
-        canvas = FigureCanvasTkAgg(fig, master=scrollable_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        plt.close(fig)
+        # One chart window is reused for every graph instead of building a new figure
+        if self.chart is None or not self.chart.window.winfo_exists():
+            self.chart = BarChartWindow(self.root)
+        view_key = None if view is None else (self.dataset.version, *view)
+        self.chart.show(title, data["Country"].tolist(), data["Life expectancy"].to_numpy(dtype=float), view_key)
+
+
+class BarChartWindow:
+    """Persistent horizontal bar chart whose bar artists are updated in place.
+
+    Bars are shown a page at a time, so the figure size and number of artists
+    stay fixed however many countries are plotted. The bars, country labels
+    and title are animated artists blitted over a cached background of the
+    axes, so paging, re-sorting or changing the year never redraws the figure.
+    Rendered pages are also kept in the shared chart cache, so going back to
+    a recent year/sort/page blits the finished image.
+    """
+
+    PAGE_SIZE = 40
+
+    def __init__(self, parent):
+        self.window = tk.Toplevel(parent)
+        self.window.geometry("900x600")
+        # Closing only hides the window so the next graph can reuse it
+        self.window.protocol("WM_DELETE_WINDOW", self.window.withdraw)
+
+        nav = tk.Frame(self.window)
+        nav.pack(side="top", fill="x", pady=3)
+        tk.Button(nav, text="< Prev", command=lambda: self.turn_page(-1)).pack(side="left", padx=5)
+        tk.Button(nav, text="Next >", command=lambda: self.turn_page(1)).pack(side="left")
+        self.page_label = tk.Label(nav, text="")
+        self.page_label.pack(side="left", padx=10)
+
+        self.figure = Figure(figsize=(9, 5.5))
+        self.figure.subplots_adjust(left=0.28, right=0.97, top=0.94, bottom=0.06)
+        self.ax = self.figure.add_subplot()
+        self.ax.set_yticks([])
+        # First entry at the top
+        self.ax.set_ylim(self.PAGE_SIZE - 0.5, -0.5)
+        self.ax.title.set_animated(True)
+        self.bars = self.ax.barh(range(self.PAGE_SIZE), np.zeros(self.PAGE_SIZE), animated=True).patches
+        # Country names are plain text artists left of the axes, cheaper to blit than tick labels
+        label_transform = self.ax.get_yaxis_transform()
+        self.labels = [
+            self.ax.text(-0.01, i, "", transform=label_transform, ha="right", va="center",
+                         fontsize=7, animated=True)
+            for i in range(self.PAGE_SIZE)
+        ]
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self.window)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.canvas.get_tk_widget().bind("<MouseWheel>", lambda e: self.turn_page(-1 if e.delta > 0 else 1))
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+
+        self.background = None
+        self.names = []
+        self.values = np.empty(0)
+        self.page = 0
+        self.view_key = None
+
+    def show(self, title, names, values, view_key=None):
+        # The original chart put the first row at the bottom, so the top of
+        # the chart (page 1 here) starts from the last row
+        # view_key identifies the data shown (dataset version, year, sort, selection)
+        self.view_key = view_key
+        self.title = title
+        self.names = names[::-1]
+        self.values = values[::-1]
+        self.xmax = max(1.0, np.nanmax(values) * 1.05) if len(values) else 1.0
+        self.page = 0
+        self.window.title(title)
+        self.window.deiconify()
+        self.window.lift()
+        self.render_page()
+
+    def page_count(self):
+        return max(1, -(-len(self.names) // self.PAGE_SIZE))
+
+    def turn_page(self, step):
+        page = min(max(self.page + step, 0), self.page_count() - 1)
+        if page != self.page:
+            self.page = page
+            self.render_page()
+
+    @timed("Life Expectancy", "plot")
+    def render_page(self):
+        start = self.page * self.PAGE_SIZE
+        names = self.names[start:start + self.PAGE_SIZE]
+        values = np.nan_to_num(self.values[start:start + self.PAGE_SIZE])
+
+        for i, (bar, label) in enumerate(zip(self.bars, self.labels)):
+            bar.set_width(values[i] if i < len(values) else 0)
+            label.set_text(names[i] if i < len(names) else "")
+        self.ax.set_title(self.title)
+        self.page_label.configure(text=f"Page {self.page + 1} of {self.page_count()}  ({len(self.names)} countries)")
+
+        cache = get_chart_cache()
+        key = None
+        if self.view_key is not None:
+            key = (*self.view_key, self.page, self.canvas.get_width_height())
+            cached = cache.get(key)
+            if cached is not None:
+                # The artists above are already updated, so later redraws match the cached image
+                frame, self.background = cached
+                self.ax.set_xlim(0, self.xmax)
+                self.canvas.restore_region(frame)
+                self.canvas.blit(self.figure.bbox)
+                return
+
+        if self.xmax == self.ax.get_xlim()[1] and self.background is not None:
+            # Axes unchanged: repaint only the animated artists
+            self.canvas.restore_region(self.background)
+            self.draw_animated()
+        else:
+            self.ax.set_xlim(0, self.xmax)
+            self.canvas.draw()
+
+        if key is not None:
+            # The finished page plus the background its animated artists were drawn over
+            frame = self.canvas.copy_from_bbox(self.figure.bbox)
+            cache.put(key, (frame, self.background), 2 * region_bytes(self.figure))
+
+    def on_draw(self, event):
+        # A full draw skips animated artists; cache that background, then add them
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_animated()
+
+    def draw_animated(self):
+        for artist in [*self.bars, *self.labels, self.ax.title]:
+            self.figure.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+
 
 if __name__ == "__main__":
     root = tk.Tk()
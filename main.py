@@ -1,15 +1,32 @@
+import importlib
+import re
+import subprocess
+import sys
+import threading
+import time
 import tkinter as tk
-from tkinter import ttk, Menu
-from data_downloader import PopulationApp  # Import both apps
-from life import life_expectancy_app  # Import life expectancy app
-from explore import open_dataset1  # Import the function from explore.py
-from comparedatasets import open_dataset  # Import the function from compare_datasets.py
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkinter import ttk, Menu, messagebox
+from instrumentation import timed, record_dataset, start_stall_monitor
+
+# Sub-apps pull in pandas and matplotlib, so they are only imported when a
+# button is clicked (or pre-warmed in the background once the window is idle)
+DEFERRED_MODULES = ["data_downloader", "life", "explore", "comparedatasets"]
+# Written to stderr by --startup-run once the launcher is drawn; -X importtime lines after it are deferred imports
+DRAWN_MARKER = "startup: launcher drawn"
+
+
+def prewarm_modules():
+    # Importing is thread-safe; later imports on the main thread become dict lookups
+    for name in DEFERRED_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # A broken sub-app should only fail when its button is clicked
+            pass
 
 
 class TheDataAnalyser:
-    def __init__(self, root):  
+    def __init__(self, root, prewarm=True):
         self.root = root
         root.geometry("300x300")
 
@@ -24,6 +41,7 @@ class TheDataAnalyser:
         helpMenu = Menu(menubar, tearoff=0) 
         helpMenu.add_command(label="About", command=self.about_info)
         helpMenu.add_command(label="Check For Updates")
+        helpMenu.add_command(label="Performance", command=self.performance_info)
         menubar.add_cascade(label="Help", menu=helpMenu)
 
         collaboratorMenu = Menu(menubar, tearoff=0)
@@ -53,7 +71,7 @@ class TheDataAnalyser:
         # Button to see both Population and GDP of a country
         self.both_data_button = tk.Button(
             self.main_frame,
-            text="See Both GDP and Population of a Country (Needs working on)",
+            text="See Both GDP and Population of a Country",
             bg="green",
             fg="black",
             command=self.open_both_data_app
@@ -75,18 +93,37 @@ class TheDataAnalyser:
             text="Compare Datasets",
             bg="green",
             fg="black",
-            command=lambda: open_dataset(self.root)
+            command=self.open_compare_datasets
         )
         self.compare_datasets_button.pack(fill="x", expand=True)
 
+        self.join_datasets_button = tk.Button(
+            self.main_frame,
+            text="Find Joinable Datasets",
+            bg="green",
+            fg="black",
+            command=self.open_join_finder
+        )
+        self.join_datasets_button.pack(fill="x", expand=True)
+
 
         # Pass 'root' when calling open_dataset
-        self.dataset_button = tk.Button(self.main_frame, text="Open Dataset", command=lambda: open_dataset1(root),
+        self.dataset_button = tk.Button(self.main_frame, text="Open Dataset", command=self.open_explore_dataset,
                                         bg="green",
                                         fg="black",)
         self.dataset_button.pack(fill = 'x', expand=True)
 
+        # Every window shares this event loop, so one monitor catches all UI freezes
+        start_stall_monitor(self.root)
+
+        # Load the heavy modules once the launcher has been drawn
+        if prewarm:
+            self.root.after_idle(
+                lambda: threading.Thread(target=prewarm_modules, daemon=True).start()
+            )
+
     def open_single_data_app(self):
+        from data_downloader import PopulationApp
         new_window = tk.Toplevel(self.root)
         PopulationApp(new_window)  # Open population data, or you could switch to GDPApp based on input
 
@@ -95,9 +132,22 @@ class TheDataAnalyser:
         BothDataApp(new_window)  # Open a new window to view both GDP and Population data
     
     def open_life_expectancy_app(self):
+        from life import life_expectancy_app
         new_window = tk.Toplevel(self.root)
         life_expectancy_app(new_window)
     
+    def open_compare_datasets(self):
+        from comparedatasets import open_dataset
+        open_dataset(self.root)
+
+    def open_join_finder(self):
+        from comparedatasets import open_join_finder
+        open_join_finder(self.root)
+
+    def open_explore_dataset(self):
+        from explore import open_dataset1
+        open_dataset1(self.root)
+
     def open_compare_datasets_app(self):
         new_window = tk.Toplevel(self.root)
         Title = tk.Label(new_window, text="Pick your datasets", font=("Arial", 16))
@@ -124,6 +174,10 @@ class TheDataAnalyser:
         )
         about_label.pack(fill="both", expand=True)
 
+    def performance_info(self):
+        from instrumentation import PerformanceWindow
+        PerformanceWindow(self.root)
+
     def hum_projects_info(self):
         hum_window = tk.Toplevel(self.root)
         hum_window.title("About hum-projects")
@@ -161,7 +215,14 @@ class TheDataAnalyser:
 class BothDataApp:
     """Class to view both GDP and Population for a single country"""
 
+    DEFAULT_INDICATORS = ("GDP", "Population")
+
     def __init__(self, root):
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from data_downloader import SearchableComboBox
+        from jobs import JobStatusBar
+
         self.root = root
         self.root.title("GDP and Population for a Country")
         
@@ -175,6 +236,11 @@ class BothDataApp:
 
         self.country_entry = tk.Entry(self.main_frame)
         self.country_entry.pack(pady=5)
+        self.searchable_combo = SearchableComboBox(self.country_entry, [], lambda country: None)
+
+        # Indicators to plot, one chart each
+        self.indicator_listbox = tk.Listbox(self.main_frame, height=5, selectmode="multiple", exportselection=False)
+        self.indicator_listbox.pack(pady=5)
 
         # Button to fetch both GDP and Population data
         self.plot_button = tk.Button(self.main_frame, text="Plot GDP and Population", command=self.plot_data)
@@ -183,53 +249,135 @@ class BothDataApp:
         # Create matplotlib figure for plotting
         self.figure, self.ax = plt.subplots(figsize=(6, 4))
         self.canvas = FigureCanvasTkAgg(self.figure, master=self.main_frame)
-        self.canvas.get_tk_widget().pack(pady=10)
-
-        # Data for GDP and Population
-        self.population_data = {}  # To be filled with real data
-        self.gdp_data = {}  # To be filled with real data
-
-        # Load your data (for now, just placeholders)
+        self.canvas.get_tk_widget().pack(pady=(10, 0))
+        # Zoom and pan; long series are downsampled again for the new range
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self.main_frame, pack_toolbar=False)
+        self.toolbar.pack(fill="x", pady=(0, 10))
+
+        self.status = JobStatusBar(self.main_frame)
+        self.status.pack(fill="x")
+
+        # Aligned country x indicator x year panel, shared with other windows
+        self.panel = None
+        # One level-of-detail reducer per indicator axes
+        self.lods = []
         self.load_data()
 
     def load_data(self):
-        # Load Population data (this can come from a CSV or API)
-        self.population_data = {
-            "2020": 700000000,  # Example: for a country
-            "2021": 705000000
-        }
-
-        # Load GDP data (this can come from a CSV or API)
-        self.gdp_data = {
-            "2020": 15000,  # Example GDP in USD
-            "2021": 16000
-        }
+        from panel import get_panel
 
-    def plot_data(self):
-        self.ax.clear()
+        def build_panel(job):
+            with timed("Both Indicators", "load"):
+                panel = get_panel()
+            record_dataset("Both Indicators", "panel", panel)
+            return panel
 
-        # Extract years for plotting
-        years = sorted(set(self.population_data.keys()).union(self.gdp_data.keys()))
-        
-        # Plot Population data
-        population_values = [self.population_data.get(year, 0) for year in years]
-        self.ax.plot(years, population_values, marker='o', label="Population", color="blue")
+        self.status.run("load", build_panel, on_done=self.on_data_loaded, message="Aligning datasets...")
+
+    def on_data_loaded(self, panel):
+        self.panel = panel
+        self.searchable_combo.set_options(list(panel.countries))
+        self.indicator_listbox.delete(0, tk.END)
+        for i, indicator in enumerate(panel.indicators):
+            self.indicator_listbox.insert(tk.END, indicator)
+            if indicator in self.DEFAULT_INDICATORS:
+                self.indicator_listbox.selection_set(i)
 
-        # Plot GDP data
-        gdp_values = [self.gdp_data.get(year, 0) for year in years]
-        self.ax.plot(years, gdp_values, marker='o', label="GDP", color="green")
+    def plot_data(self):
+        from downsample import LevelOfDetail
+
+        country = self.country_entry.get().strip()
+        if self.panel is None or country not in self.panel:
+            messagebox.showwarning("Invalid Country", "Please select a valid country from the list.")
+            return
+        indicators = [self.indicator_listbox.get(i) for i in self.indicator_listbox.curselection()]
+        if not indicators:
+            return
+
+        with timed("Both Indicators", "plot", country):
+            # Indicators have very different scales, so each gets its own axes
+            for lod in self.lods:
+                lod.remove()
+            self.figure.clear()
+            axes = self.figure.subplots(len(indicators), 1, sharex=True, squeeze=False)[:, 0]
+            self.lods = [LevelOfDetail(ax) for ax in axes]
+            for ax, lod, indicator in zip(axes, self.lods, indicators):
+                years, values = self.panel.series(country, indicator)
+                lod.plot(years, values, marker='o')
+                lod.enable_tooltips()
+                ax.set_ylabel(indicator, fontsize=7)
+                ax.grid(True)
+            self.ax = axes[0]
+
+            # Set titles and labels
+            axes[0].set_title(f"{country} Over Time")
+            axes[-1].set_xlabel("Year")
+            self.figure.tight_layout()
+            # tight_layout changed the axes widths the series were reduced for
+            for lod in self.lods:
+                lod.update()
+            self.toolbar.update()
+
+            # Redraw canvas
+            self.canvas.draw()
+
+def run_startup_profile():
+    """Re-run the launcher under ``-X importtime`` and print where startup time goes."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", __file__, "--startup-run"],
+        capture_output=True,
+        text=True,
+    )
+
+    # importtime lines look like "import time:  self [us] | cumulative | name"
+    imports = []
+    for line in result.stderr.splitlines():
+        if line == DRAWN_MARKER:
+            break
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)", line)
+        if match and not match.group(3):
+            imports.append((int(match.group(2)), match.group(4)))
+
+    print("Top-level imports before the launcher is drawn (cumulative):")
+    for cumulative_us, name in sorted(imports, reverse=True)[:15]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    print(f"  {sum(us for us, _ in imports) / 1000:8.1f} ms  total")
+    print()
+    print(result.stdout.strip())
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1])
+    elif DRAWN_MARKER not in result.stderr:
+        print("(the launcher was never drawn, so every import above is counted)")
+
+
+def run_startup_measurement(started):
+    """Build the launcher, report time to first draw, then time each deferred module.
+
+    The background prewarm is off here, so each module is imported only by the timed loop below.
+    """
+    root = tk.Tk()
+    TheDataAnalyser(root, prewarm=False)
+    root.update()
+    print(f"Launcher drawn in {(time.perf_counter() - started) * 1000:.1f} ms")
+    print(DRAWN_MARKER, file=sys.stderr, flush=True)
+    root.destroy()
 
-        # Set titles and labels
-        self.ax.set_title("GDP and Population Over Time")
-        self.ax.set_xlabel("Year")
-        self.ax.set_ylabel("Values")
-        self.ax.legend()
+    print("Deferred sub-app imports (loaded on first click):")
+    for name in DEFERRED_MODULES:
+        module_start = time.perf_counter()
+        importlib.import_module(name)
+        print(f"  {(time.perf_counter() - module_start) * 1000:8.1f} ms  {name}")
 
-        # Redraw canvas
-        self.canvas.draw()
 
 # Main program execution
 if __name__ == "__main__":
+    if "--startup-profile" in sys.argv:
+        run_startup_profile()
+        sys.exit()
+    if "--startup-run" in sys.argv:
+        run_startup_measurement(time.perf_counter())
+        sys.exit()
+
     root = tk.Tk()
     app = TheDataAnalyser(root)
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,143 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import load_csv
+from registry import dataset_signature
+from worldbank import load_wide
+from countries import get_country_index
+
+# Wide World Bank files: file name -> indicator name
+WIDE_SOURCES = {
+    "population.csv": "Population growth (annual %)",
+    "internet.csv": "Internet users (% of population)",
+}
+# Long (country, year) files: file name -> {column: indicator name}
+LONG_SOURCES = {
+    "life.csv": {
+        "Life expectancy": "Life expectancy",
+        "GDP": "GDP",
+        "Population": "Population",
+    },
+}
+
+
+class Panel:
+    """Country x indicator x year cube aligned from several datasets.
+
+    ``values[c, i, y]`` holds indicator ``i`` for country ``c`` in year ``y``
+    (NaN if no source has it), so any country/indicator/year-range lookup is
+    an array slice.
+    """
+
+    def __init__(self, country_index, country_ids, indicators, years, values):
+        self.country_index = country_index
+        self.country_ids = country_ids
+        self.countries = [country_index.name_of(i) for i in country_ids]
+        self.aggregate = np.array([country_index.is_aggregate(i) for i in country_ids], dtype=bool)
+        self.indicators = indicators
+        self.years = years
+        self.values = values
+        self.country_pos = {country_id: i for i, country_id in enumerate(country_ids)}
+        self.indicator_pos = {name: i for i, name in enumerate(indicators)}
+
+    def position(self, country):
+        """Row of a country given any known spelling or ISO3 code, or None."""
+        return self.country_pos.get(self.country_index.id_of(country))
+
+    def __contains__(self, country):
+        return self.position(country) is not None
+
+    def series(self, country, indicator, start_year=None, end_year=None):
+        """Years and values of one indicator for one country, missing years dropped."""
+        c = self.position(country)
+        i = self.indicator_pos[indicator]
+        lo = 0 if start_year is None else np.searchsorted(self.years, start_year)
+        hi = len(self.years) if end_year is None else np.searchsorted(self.years, end_year, side="right")
+        years, values = self.years[lo:hi], self.values[c, i, lo:hi]
+        present = ~np.isnan(values)
+        return years[present], values[present]
+
+
+def build_panel(wide_tables, long_frames, country_index):
+    """Align wide tables and long frames on integer (country ID, year) keys.
+
+    ``wide_tables`` maps indicator names to WideTables. ``long_frames`` is a
+    list of (frame, country column, year column, {column: indicator}) tuples.
+    Country names are resolved to IDs through ``country_index``, so different
+    spellings of the same country land on the same row.
+    """
+    names = [table.countries for table in wide_tables.values()]
+    names += [frame[country_col].to_numpy(dtype=object) for frame, country_col, _, _ in long_frames]
+    all_names = np.concatenate(names) if names else np.empty(0, dtype=object)
+
+    ids = country_index.ids_of(all_names)
+    for i in np.flatnonzero(ids < 0):
+        if isinstance(all_names[i], str):
+            ids[i] = country_index.add(all_names[i])
+    # Rows with no country name at all are dropped below
+    country_ids, codes = np.unique(ids, return_inverse=True)
+    if len(country_ids) and country_ids[0] < 0:
+        codes = codes - 1
+        country_ids = country_ids[1:]
+
+    all_years = [table.years for table in wide_tables.values()]
+    all_years += [frame[year_col].to_numpy() for frame, _, year_col, _ in long_frames]
+    years = np.unique(np.concatenate(all_years).astype(int)) if all_years else np.empty(0, dtype=int)
+
+    indicators = list(wide_tables)
+    for _, _, _, columns in long_frames:
+        indicators += [name for name in columns.values() if name not in indicators]
+    indicator_pos = {name: i for i, name in enumerate(indicators)}
+
+    values = np.full((len(country_ids), len(indicators), len(years)), np.nan)
+
+    offset = 0
+    for indicator, table in wide_tables.items():
+        rows = codes[offset:offset + len(table)]
+        offset += len(table)
+        cols = np.searchsorted(years, table.years)
+        keep = rows >= 0
+        values[rows[keep, None], indicator_pos[indicator], cols[None, :]] = table.values[keep]
+
+    for frame, _, year_col, columns in long_frames:
+        rows = codes[offset:offset + len(frame)]
+        offset += len(frame)
+        cols = np.searchsorted(years, frame[year_col].to_numpy().astype(int))
+        keep = rows >= 0
+        for column, indicator in columns.items():
+            column_values = pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=float)
+            values[rows[keep], indicator_pos[indicator], cols[keep]] = column_values[keep]
+
+    return Panel(country_index, country_ids.tolist(), indicators, years, values)
+
+
+_panel_cache = {}
+_panel_lock = threading.Lock()
+
+
+def get_panel():
+    """The panel of all bundled indicators, rebuilt only when a source file changes."""
+    paths, signature = dataset_signature([*WIDE_SOURCES, *LONG_SOURCES])
+
+    with _panel_lock:
+        if signature in _panel_cache:
+            return _panel_cache[signature]
+
+        wide_tables = {
+            indicator: load_wide(paths[name])
+            for name, indicator in WIDE_SOURCES.items() if name in paths
+        }
+        long_frames = []
+        for name, columns in LONG_SOURCES.items():
+            if name in paths:
+                frame = load_csv(paths[name])
+                frame.columns = frame.columns.str.strip()
+                long_frames.append((frame, "Country", "Year", columns))
+
+        panel = build_panel(wide_tables, long_frames, get_country_index())
+        # Only the panel for the current file versions is kept
+        _panel_cache.clear()
+        _panel_cache[signature] = panel
+        return panel
@@ -1,40 +1,171 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import matplotlib.pyplot as plt
+from dataset_cache import load_csv
+from registry import require_dataset
+from spatial import get_city_grid
+
+# Rows read at a time in streaming mode; memory use is bounded by this
+CHUNK_ROWS = 50_000
+
+# Partial statistic -> how partials from different chunks are merged
+MERGE_RULES = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+
+def aqi_columns(columns):
+    # 2. Identify AQI columns
+    return [col for col in columns if "AQI" in col]
+
+
+def country_averages(df):
+    """Average AQI per country with the whole file in memory."""
+    aqi_cols = aqi_columns(df.columns)
+
+    df[aqi_cols] = df[aqi_cols].apply(pd.to_numeric, errors="coerce")
+
+    # 4. Average AQI per row (for all city measurements)
+    df["AQI_overall"] = df[aqi_cols].mean(axis=1)
+
+    # 5. Average AQI per country
+    df_country_avg = (
+        df.groupby("Country", observed=True)["AQI_overall"]
+        .mean()
+        .reset_index()
+        .rename(columns={"AQI_overall": "Average_AQI"})
+    )
+
+    # 6. Sort countries from cleanest ➝ dirtiest
+    return df_country_avg.sort_values("Average_AQI")
+
+
+def aggregate_chunk(chunk):
+    """Per-country sum, count, min and max of each AQI value and the row average."""
+    aqi_cols = aqi_columns(chunk.columns)
+    values = chunk[aqi_cols].apply(pd.to_numeric, errors="coerce")
+    values["AQI_overall"] = values.mean(axis=1)
+
+    # Category columns are all NaN once coerced; they only matter for the row mean
+    numeric_cols = [col for col in values.columns if values[col].notna().any() or col == "AQI_overall"]
+    values["Country"] = chunk["Country"]
+    return values.groupby("Country")[numeric_cols].agg(list(MERGE_RULES))
+
+
+def merge_partials(partials):
+    """Combine per-chunk (or per-file) statistics into one table."""
+    partials = [partial for partial in partials if len(partial)]
+    if not partials:
+        return pd.DataFrame()
+    combined = pd.concat(partials)
+    rules = {column: MERGE_RULES[column[1]] for column in combined.columns}
+    return combined.groupby(level=0).agg(rules)
+
+
+def aggregate_file(path, chunk_rows=CHUNK_ROWS):
+    """Stream one CSV and return its merged per-country statistics."""
+    partial = None
+    chunks = pd.read_csv(path, chunksize=chunk_rows, usecols=lambda col: col == "Country" or "AQI" in col)
+    for chunk in chunks:
+        stats = aggregate_chunk(chunk)
+        # Merge as we go so only one chunk and the running totals are in memory
+        partial = stats if partial is None else merge_partials([partial, stats])
+    return partial if partial is not None else pd.DataFrame()
+
+
+def aggregate_files(paths, chunk_rows=CHUNK_ROWS, workers=1):
+    """Stream several CSV shards, in parallel processes if ``workers`` > 1."""
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(aggregate_file, paths, [chunk_rows] * len(paths)))
+    else:
+        partials = [aggregate_file(path, chunk_rows) for path in paths]
+    return merge_partials(partials)
+
+
+def streamed_country_averages(stats):
+    """The same table as country_averages, computed from merged statistics."""
+    if stats.empty:
+        return pd.DataFrame(columns=["Country", "Average_AQI"])
+    overall = stats["AQI_overall"]
+    # Countries with no numeric readings get NaN, like a mean over nothing
+    average = overall["sum"] / overall["count"].where(overall["count"] > 0)
+    df_country_avg = average.rename("Average_AQI").rename_axis("Country").reset_index()
+    return df_country_avg.sort_values("Average_AQI")
 
-df = pd.read_csv("pollution.csv")
 
+def plot_country_averages(df_country_avg_sorted):
+    plt.figure(figsize=(14, 7))
+    plt.barh(df_country_avg_sorted["Country"], df_country_avg_sorted["Average_AQI"])
+    plt.xlabel("Average AQI")
+    plt.title("Average AQI by Country (Cleanest → Dirtiest)")
+    plt.tight_layout()
+    plt.show()
 
-# 2. Identify AQI columns
-aqi_cols = [col for col in df.columns if "AQI" in col]
 
+def print_city_rows(grid, indices, distances=None):
+    for n, i in enumerate(indices):
+        country, city = grid.labels.iloc[i]
+        distance = "" if distances is None else f"{distances[n]:8.1f} km  "
+        print(f"  {distance}{city}, {country}  AQI {grid.values['AQI Value'][i]:.0f}")
 
-df[aqi_cols] = df[aqi_cols].apply(pd.to_numeric, errors="coerce")
 
+def spatial_query(path, args):
+    """Answer --near / --bbox from the cached grid index instead of scanning every row."""
+    grid = get_city_grid(path)
 
-# 4. Average AQI per row (for all city measurements)
-df["AQI_overall"] = df[aqi_cols].mean(axis=1)
+    if args.near:
+        i = grid.find_city(args.near)
+        if i is None:
+            print(f"City not found: {args.near}")
+            return
+        lat, lng = grid.lat[i], grid.lng[i]
+        if args.radius:
+            indices, distances = grid.within_radius(lat, lng, args.radius)
+            print(f"Cities within {args.radius:g} km of {args.near}:")
+        else:
+            indices, distances = grid.nearest(lat, lng, args.k + 1)
+            print(f"{args.k} nearest cities to {args.near}:")
+            others = indices != i
+            indices, distances = indices[others][:args.k], distances[others][:args.k]
+        print_city_rows(grid, indices, distances)
 
-# 5. Average AQI per country
+    if args.bbox:
+        lat_min, lat_max, lng_min, lng_max = args.bbox
+        for column in grid.values:
+            stats = grid.bbox_aggregate(column, lat_min, lat_max, lng_min, lng_max)
+            print(f"  {column:16} count {stats['count']:6d}  mean {stats['mean']:7.1f}  "
+                  f"min {stats['min']:5.0f}  max {stats['max']:5.0f}")
 
-df_country_avg = (
-    df.groupby("Country")["AQI_overall"]
-    .mean()
-    .reset_index()
-    .rename(columns={"AQI_overall": "Average_AQI"})
-)
 
-# 6. Sort countries from cleanest ➝ dirtiest
-df_country_avg_sorted = df_country_avg.sort_values("Average_AQI")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Average AQI by country.")
+    parser.add_argument("files", nargs="*", help="pollution CSV files or shards (default: pollution.csv)")
+    parser.add_argument("--stream", action="store_true",
+                        help="aggregate in chunks with bounded memory instead of loading whole files")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=1, help="processes for streaming several shards")
+    parser.add_argument("--near", metavar="CITY", help="list the cities nearest to CITY")
+    parser.add_argument("-k", type=int, default=5, help="how many nearest cities to list")
+    parser.add_argument("--radius", type=float, metavar="KM", help="with --near, list every city within KM")
+    parser.add_argument("--bbox", type=float, nargs=4, metavar=("LAT_MIN", "LAT_MAX", "LNG_MIN", "LNG_MAX"),
+                        help="AQI statistics for the cities inside a lat/lng box")
+    args = parser.parse_args()
 
-# 7. Display summary table
-print(df_country_avg_sorted)
+    paths = args.files or [require_dataset("pollution.csv")]
 
-plt.figure(figsize=(14, 7))
-plt.barh(df_country_avg_sorted["Country"], df_country_avg_sorted["Average_AQI"])
-plt.xlabel("Average AQI")
-plt.title("Average AQI by Country (Cleanest → Dirtiest)")
-plt.tight_layout()
-plt.show()
+    if args.near or args.bbox:
+        spatial_query(paths[0], args)
+        raise SystemExit
 
+    if args.stream:
+        stats = aggregate_files(paths, args.chunk_rows, args.workers)
+        df_country_avg_sorted = streamed_country_averages(stats)
+    else:
+        df = pd.concat([load_csv(path, compact=True) for path in paths], ignore_index=True)
+        df_country_avg_sorted = country_averages(df)
 
+    # 7. Display summary table
+    print(df_country_avg_sorted)
 
+    plot_country_averages(df_country_avg_sorted)
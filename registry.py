@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+
+from dataset_cache import CACHE_DIR, source_signature
+from schemas import read_header
+
+# Where datasets are looked for, in priority order. Override with DATA_ROOTS
+# (separated by os.pathsep); by default the program folder and the working directory.
+DEFAULT_ROOTS = [os.path.dirname(os.path.abspath(__file__)), os.getcwd()]
+# How many directory levels below each root are scanned
+MAX_DEPTH = 2
+DATASET_EXTENSIONS = (".csv", ".xlsx")
+SKIPPED_DIRS = {"__pycache__", "node_modules", "venv", "site-packages"}
+
+MANIFEST_PATH = os.path.join(CACHE_DIR, "manifest.json")
+
+
+def configured_roots():
+    roots = os.environ.get("DATA_ROOTS")
+    if roots:
+        return [os.path.abspath(root) for root in roots.split(os.pathsep) if root]
+    return list(dict.fromkeys(DEFAULT_ROOTS))
+
+
+class DatasetRegistry:
+    """Manifest of the datasets under the configured roots.
+
+    Each entry records a file's path, size, mtime and header columns. The
+    manifest is saved next to the dataset cache, so lookups by name are a dict
+    access; the roots are only rescanned when a name is missing or stale.
+    """
+
+    def __init__(self, roots=None, manifest_path=MANIFEST_PATH):
+        self.roots = roots or configured_roots()
+        self.manifest_path = manifest_path
+        self.datasets = {}
+        self.lock = threading.Lock()
+        self.load_manifest()
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if manifest.get("roots") == self.roots:
+            self.datasets = manifest.get("datasets", {})
+
+    def save_manifest(self):
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            staging = self.manifest_path + ".tmp"
+            with open(staging, "w", encoding="utf-8") as f:
+                json.dump({"roots": self.roots, "datasets": self.datasets}, f)
+            os.replace(staging, self.manifest_path)
+        except OSError:
+            pass
+
+    def refresh(self):
+        """Rescan the roots; only new or changed files have their header re-read."""
+        with self.lock:
+            previous = {entry["path"]: entry for entry in self.datasets.values()}
+            datasets = {}
+            for root in self.roots:
+                for path, stat in scan_datasets(root, MAX_DEPTH):
+                    name = os.path.basename(path)
+                    if name in datasets:
+                        # Earlier roots take priority
+                        continue
+                    entry = previous.get(path)
+                    if not entry or (entry["size"], entry["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+                        entry = {
+                            "path": path,
+                            "size": stat.st_size,
+                            "mtime_ns": stat.st_mtime_ns,
+                            "columns": sniff_columns(path),
+                        }
+                    datasets[name] = entry
+            self.datasets = datasets
+            self.save_manifest()
+
+    def entry(self, name):
+        """Manifest entry for a dataset file name such as "life.csv"."""
+        entry = self.datasets.get(name)
+        if entry is None or not os.path.isfile(entry["path"]):
+            self.refresh()
+            entry = self.datasets.get(name)
+        return entry
+
+    def resolve(self, name):
+        """Path of the named dataset, or None if it is not under any root."""
+        entry = self.entry(name)
+        return entry["path"] if entry else None
+
+
+def scan_datasets(root, depth):
+    """Yield (path, stat) for dataset files under ``root`` using os.scandir."""
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+
+    subdirs = []
+    for entry in sorted(entries, key=lambda e: e.name):
+        try:
+            if entry.is_file() and entry.name.endswith(DATASET_EXTENSIONS):
+                yield entry.path, entry.stat()
+            elif (depth > 0 and entry.is_dir(follow_symlinks=False)
+                  and not entry.name.startswith(".") and entry.name not in SKIPPED_DIRS):
+                subdirs.append(entry.path)
+        except OSError:
+            continue
+
+    for subdir in subdirs:
+        yield from scan_datasets(subdir, depth - 1)
+
+
+def sniff_columns(path):
+    try:
+        return read_header(path)
+    except Exception:
+        return None
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = DatasetRegistry()
+        return _registry
+
+
+def resolve_dataset(name):
+    """Path of a dataset by file name, or None."""
+    return get_registry().resolve(name)
+
+
+def require_dataset(name):
+    """Path of a dataset by file name; raises FileNotFoundError if it is missing."""
+    path = resolve_dataset(name)
+    if path is None:
+        roots = ", ".join(get_registry().roots)
+        raise FileNotFoundError(f"{name} not found under the data roots: {roots}")
+    return path
+
+
+def dataset_signature(names):
+    """Paths of the named datasets that exist, and a signature of their versions.
+
+    Returns ``(paths, signature)``: ``paths`` maps each name found to its
+    path, and ``signature`` holds the (path, size, mtime) of each, so it
+    changes whenever one of the files does. Missing names are left out.
+    """
+    paths = {name: resolve_dataset(name) for name in names}
+    paths = {name: path for name, path in paths.items() if path}
+    signature = tuple(sorted((name, tuple(source_signature(path).values())) for name, path in paths.items()))
+    return paths, signature
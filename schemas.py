@@ -0,0 +1,100 @@
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# CSV headers take microseconds and are always read in-process. Opening a
+# workbook takes tens of milliseconds, so above this many uncached .xlsx files
+# they are read on a process pool, which costs about a second to start
+PARALLEL_THRESHOLD = 64
+
+# abspath -> (size, mtime_ns, columns)
+_schema_cache = {}
+
+
+def read_header(path):
+    """Column names of a CSV or XLSX file, read from its first row only.
+
+    Returns None for unsupported file types.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+            header = next(csv.reader(f), [])
+    elif path.endswith(".xlsx"):
+        # Read-only mode streams the sheet instead of loading the whole workbook
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+        finally:
+            workbook.close()
+    else:
+        return None
+    return header_names(header)
+
+
+def header_names(header):
+    # Name blank headers the way pandas does so results match a full load
+    return [
+        f"Unnamed: {i}" if value is None or str(value) == "" else str(value)
+        for i, value in enumerate(header)
+    ]
+
+
+def normalize_columns(columns):
+    return {str(col).strip().lower() for col in columns}
+
+
+def sniff_schemas(file_paths, job=None):
+    """Map each file to its set of normalised column names without loading the data.
+
+    Unsupported files map to None. Schemas are cached by path, size and mtime.
+    """
+    schemas = {}
+    pending = []
+
+    for file in file_paths:
+        stat = os.stat(file)
+        cached = _schema_cache.get(os.path.abspath(file))
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            schemas[file] = cached[2]
+        else:
+            pending.append((file, stat))
+
+    workbooks = list(dict.fromkeys(file for file, _ in pending if file.endswith(".xlsx")))
+    parsed = {}
+    if len(workbooks) >= PARALLEL_THRESHOLD and (os.cpu_count() or 1) > 1:
+        # spawn keeps the workers free of the parent's Tk and thread state
+        context = multiprocessing.get_context("spawn")
+        workers = min(len(workbooks), os.cpu_count(), 8)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            parsed = dict(zip(workbooks, pool.map(_read_header_safely, workbooks, chunksize=4)))
+    headers = (parsed[file] if file in parsed else _read_header_safely(file) for file, _ in pending)
+    results = _collect(pending, headers, job)
+
+    for (file, stat), columns in zip(pending, results):
+        _schema_cache[os.path.abspath(file)] = (stat.st_size, stat.st_mtime_ns, columns)
+        schemas[file] = columns
+
+    return {file: schemas[file] for file in file_paths}
+
+
+def _read_header_safely(path):
+    # May run in a worker process, so errors travel back as text
+    try:
+        header = read_header(path)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    return (None if header is None else normalize_columns(header)), None
+
+
+def _collect(pending, headers, job):
+    results = []
+    for i, ((file, _), (columns, error)) in enumerate(zip(pending, headers)):
+        if error is not None:
+            raise ValueError(f"Could not load:\n{file}\n\n{error}")
+        results.append(columns)
+        if job is not None:
+            job.report((i + 1) / len(pending), f"Read header of {os.path.basename(file)}")
+    return results
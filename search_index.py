@@ -0,0 +1,67 @@
+from collections import defaultdict
+
+import numpy as np
+
+
+class SubstringIndex:
+    """Case-insensitive substring search over a fixed list of options.
+
+    Options are indexed by their character trigrams, so a query of three or
+    more characters only checks options that contain all of its trigrams.
+    Shorter queries are usually refinements of an earlier result, which can be
+    passed as ``within`` to search that result instead of every option.
+    """
+
+    N = 3
+
+    def __init__(self, options):
+        self.options = list(options)
+        self.keys = [str(option).lower() for option in self.options]
+        # First position of each option, like list.index without the scan
+        self.positions = {}
+        for i, option in enumerate(self.options):
+            self.positions.setdefault(option, i)
+
+        postings = defaultdict(list)
+        for i, key in enumerate(self.keys):
+            for gram in {key[j:j + self.N] for j in range(len(key) - self.N + 1)}:
+                postings[gram].append(i)
+        # Sorted int32 arrays are far smaller than sets and intersect quickly
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.options)
+
+    def position_of(self, option):
+        """Index of ``option`` in the options, or None if it is not one of them."""
+        return self.positions.get(option)
+
+    def search(self, query, within=None):
+        """Sorted indices of the options containing ``query``.
+
+        ``within`` is an optional sorted array of indices known to contain
+        every match, such as the result for a shorter prefix of ``query``.
+        """
+        query = query.lower()
+        if not query:
+            return np.arange(len(self.keys), dtype=np.int32) if within is None else within
+
+        if len(query) < self.N:
+            candidates = range(len(self.keys)) if within is None else within
+        else:
+            grams = {query[j:j + self.N] for j in range(len(query) - self.N + 1)}
+            lists = [self.postings.get(gram) for gram in grams]
+            if any(ids is None for ids in lists):
+                return np.empty(0, dtype=np.int32)
+            lists.sort(key=len)
+            if within is not None:
+                lists.insert(0, within)
+            candidates = lists[0]
+            for ids in lists[1:]:
+                candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            # A single trigram hit is exact; longer queries still need checking
+            if len(query) == self.N:
+                return np.asarray(candidates, dtype=np.int32)
+
+        keys = self.keys
+        return np.array([i for i in candidates if query in keys[i]], dtype=np.int32)
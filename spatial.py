@@ -0,0 +1,177 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import load_csv, source_signature
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.195
+# Grid cell size; 1 degree is about 111 km north-south
+CELL_DEGREES = 1.0
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class CityGrid:
+    """Uniform lat/lng grid over city coordinates.
+
+    Cities are sorted by grid cell so each cell is one contiguous slice, and
+    every cell also keeps the count/sum/min/max of each value column. Radius
+    and nearest-city queries only look at the cells around the query point;
+    bounding-box aggregates use the per-cell totals for cells fully inside the
+    box and scan rows only in the cells along its edges.
+    """
+
+    def __init__(self, lat, lng, values, labels, cell_degrees=CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.n_rows = int(np.ceil(180 / cell_degrees))
+        self.n_cols = int(np.ceil(360 / cell_degrees))
+
+        lat = np.asarray(lat, dtype=float)
+        lng = np.asarray(lng, dtype=float)
+        valid = ~(np.isnan(lat) | np.isnan(lng))
+        cells = self.cell_of(lat[valid], lng[valid])
+        order = np.argsort(cells, kind="stable")
+
+        source_rows = np.flatnonzero(valid)[order]
+        self.lat = lat[source_rows]
+        self.lng = lng[source_rows]
+        self.labels = labels.iloc[source_rows].reset_index(drop=True)
+        self.values = {name: np.asarray(column, dtype=float)[source_rows] for name, column in values.items()}
+
+        # starts[c]:starts[c + 1] are the cities in cell c
+        sorted_cells = cells[order]
+        self.starts = np.searchsorted(sorted_cells, np.arange(self.n_rows * self.n_cols + 1))
+
+        self.cell_stats = {}
+        n_cells = self.n_rows * self.n_cols
+        for name, column in self.values.items():
+            present = ~np.isnan(column)
+            cell_ids = sorted_cells[present]
+            column_values = column[present]
+            minimum = np.full(n_cells, np.inf)
+            maximum = np.full(n_cells, -np.inf)
+            np.minimum.at(minimum, cell_ids, column_values)
+            np.maximum.at(maximum, cell_ids, column_values)
+            self.cell_stats[name] = {
+                "count": np.bincount(cell_ids, minlength=n_cells),
+                "sum": np.bincount(cell_ids, weights=column_values, minlength=n_cells),
+                "min": minimum,
+                "max": maximum,
+            }
+
+    def __len__(self):
+        return len(self.lat)
+
+    def cell_of(self, lat, lng):
+        row = np.clip(((np.asarray(lat) + 90) // self.cell_degrees).astype(int), 0, self.n_rows - 1)
+        col = ((np.asarray(lng) + 180) // self.cell_degrees).astype(int) % self.n_cols
+        return row * self.n_cols + col
+
+    def rows_in_cells(self, rows, cols):
+        """Indices of the cities in every (row, col) cell combination."""
+        cells = (np.asarray(rows)[:, None] * self.n_cols + np.asarray(cols)[None, :]).ravel()
+        slices = [np.arange(self.starts[c], self.starts[c + 1]) for c in cells if self.starts[c + 1] > self.starts[c]]
+        return np.concatenate(slices) if slices else np.empty(0, dtype=int)
+
+    def within_radius(self, lat, lng, radius_km):
+        """Indices and distances of cities within ``radius_km``, nearest first."""
+        dlat = radius_km / KM_PER_DEGREE
+        row_lo = max(0, int((lat - dlat + 90) // self.cell_degrees))
+        row_hi = min(self.n_rows - 1, int((lat + dlat + 90) // self.cell_degrees))
+        rows = np.arange(row_lo, row_hi + 1)
+
+        # Longitude degrees shrink towards the poles
+        max_abs_lat = min(89.9, abs(lat) + dlat)
+        dlng = dlat / np.cos(np.radians(max_abs_lat))
+        if dlng >= 180:
+            cols = np.arange(self.n_cols)
+        else:
+            col_lo = int((lng - dlng + 180) // self.cell_degrees)
+            col_hi = int((lng + dlng + 180) // self.cell_degrees)
+            cols = np.unique(np.arange(col_lo, col_hi + 1) % self.n_cols)
+
+        candidates = self.rows_in_cells(rows, cols)
+        distances = haversine_km(lat, lng, self.lat[candidates], self.lng[candidates])
+        inside = distances <= radius_km
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return candidates[order], distances[order]
+
+    def nearest(self, lat, lng, k=5):
+        """The ``k`` nearest cities, searching outwards ring by ring."""
+        radius = self.cell_degrees * KM_PER_DEGREE
+        while True:
+            indices, distances = self.within_radius(lat, lng, radius)
+            # Everything within the radius is found, so the k closest are exact
+            if len(indices) >= k or radius >= np.pi * EARTH_RADIUS_KM:
+                return indices[:k], distances[:k]
+            radius *= 2
+
+    def bbox_aggregate(self, column, lat_min, lat_max, lng_min, lng_max):
+        """Count, mean, min and max of ``column`` for cities inside a lat/lng box."""
+        cd = self.cell_degrees
+        row_lo = max(0, int((lat_min + 90) // cd))
+        row_hi = min(self.n_rows - 1, int((lat_max + 90) // cd))
+        col_lo = max(0, int((lng_min + 180) // cd))
+        col_hi = min(self.n_cols - 1, int((lng_max + 180) // cd))
+        rows = np.arange(row_lo, row_hi + 1)
+        cols = np.arange(col_lo, col_hi + 1)
+
+        # Cells entirely inside the box use their precomputed totals
+        row_inside = (rows * cd - 90 >= lat_min) & ((rows + 1) * cd - 90 <= lat_max)
+        col_inside = (cols * cd - 180 >= lng_min) & ((cols + 1) * cd - 180 <= lng_max)
+        inner = (rows[row_inside][:, None] * self.n_cols + cols[col_inside][None, :]).ravel()
+        stats = self.cell_stats[column]
+        count = int(stats["count"][inner].sum())
+        total = float(stats["sum"][inner].sum())
+        minimum = float(stats["min"][inner].min()) if len(inner) else np.inf
+        maximum = float(stats["max"][inner].max()) if len(inner) else -np.inf
+
+        # Cells on the edge of the box are scanned row by row
+        edge_cells = np.setdiff1d((rows[:, None] * self.n_cols + cols[None, :]).ravel(), inner)
+        edge = [np.arange(self.starts[c], self.starts[c + 1]) for c in edge_cells]
+        edge = np.concatenate(edge) if edge else np.empty(0, dtype=int)
+        inside = ((self.lat[edge] >= lat_min) & (self.lat[edge] <= lat_max)
+                  & (self.lng[edge] >= lng_min) & (self.lng[edge] <= lng_max))
+        edge_values = self.values[column][edge[inside]]
+        edge_values = edge_values[~np.isnan(edge_values)]
+        if len(edge_values):
+            count += len(edge_values)
+            total += float(edge_values.sum())
+            minimum = min(minimum, float(edge_values.min()))
+            maximum = max(maximum, float(edge_values.max()))
+
+        if count == 0:
+            return {"count": 0, "mean": np.nan, "min": np.nan, "max": np.nan}
+        return {"count": count, "mean": total / count, "min": minimum, "max": maximum}
+
+    def find_city(self, name):
+        """Index of the first city with this name (case-insensitive), or None."""
+        matches = np.flatnonzero(self.labels["City"].str.casefold().to_numpy() == name.strip().casefold())
+        return int(matches[0]) if len(matches) else None
+
+
+def build_city_grid(df, cell_degrees=CELL_DEGREES):
+    value_columns = [col for col in df.columns if "AQI Value" in col]
+    values = {col: pd.to_numeric(df[col], errors="coerce") for col in value_columns}
+    return CityGrid(df["lat"], df["lng"], values, df[["Country", "City"]], cell_degrees)
+
+
+_grid_cache = {}
+_grid_lock = threading.Lock()
+
+
+def get_city_grid(path):
+    """Grid over a pollution file, built once per file version."""
+    signature = tuple(source_signature(path).values())
+    with _grid_lock:
+        if signature not in _grid_cache:
+            _grid_cache[signature] = build_city_grid(load_csv(path))
+        return _grid_cache[signature]
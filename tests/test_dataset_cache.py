@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset_cache
+from dataset_cache import compact_frame, load_csv
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(dataset_cache, "CACHE_DIR", str(directory))
+    return directory
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    rng = np.random.default_rng(0)
+    countries = np.array(["France", "Chad", "Peru", "Côte d'Ivoire"])
+    df = pd.DataFrame({
+        "Country": countries[rng.integers(0, len(countries), 500)],
+        "Year": rng.integers(1960, 2024, 500),
+        "Value": rng.normal(size=500),
+        "Population": rng.integers(10**7, 10**9, 500).astype(float),
+    })
+    df.loc[::7, "Value"] = np.nan
+    df.loc[::11, "Country"] = None
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def assert_same_frame(actual, expected, **kwargs):
+    pd.testing.assert_frame_equal(pd.DataFrame(actual), expected, check_dtype=False, **kwargs)
+
+
+def test_round_trip_matches_read_csv(cache_dir, csv_path):
+    expected = pd.read_csv(csv_path)
+    first = load_csv(csv_path)
+    assert os.listdir(cache_dir)
+    cached = load_csv(csv_path)
+    assert_same_frame(first, expected)
+    assert_same_frame(cached, expected)
+    assert [str(dtype) for dtype in cached.dtypes] == [str(dtype) for dtype in expected.dtypes]
+
+
+def test_read_csv_options_are_cached_separately(cache_dir, csv_path):
+    load_csv(csv_path)
+    subset = load_csv(csv_path, usecols=["Country", "Year"])
+    assert_same_frame(subset, pd.read_csv(csv_path, usecols=["Country", "Year"]))
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_compact_round_trip_matches_compact_frame(cache_dir, csv_path):
+    expected = compact_frame(pd.read_csv(csv_path))
+    load_csv(csv_path, compact=True)
+    cached = load_csv(csv_path, compact=True)
+    assert isinstance(cached["Country"].dtype, pd.CategoricalDtype)
+    assert cached["Value"].dtype == np.float32
+    # Populations are whole numbers too large for float32
+    assert cached["Population"].dtype == np.float64
+    pd.testing.assert_frame_equal(cached, expected, check_categorical=False)
+
+
+def test_changed_source_is_read_again(cache_dir, csv_path):
+    load_csv(csv_path)
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("Chad,2024,1.5,20000000.0\n")
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    reloaded = load_csv(csv_path)
+    assert_same_frame(reloaded, pd.read_csv(csv_path))
+    assert reloaded.iloc[-1]["Year"] == 2024
+
+
+def test_corrupt_cache_falls_back_to_parsing(cache_dir, csv_path):
+    load_csv(csv_path)
+    for entry in cache_dir.iterdir():
+        (entry / "meta.json").write_text("{not json", encoding="utf-8")
+    assert_same_frame(load_csv(csv_path), pd.read_csv(csv_path))
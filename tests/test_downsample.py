@@ -0,0 +1,64 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backend_bases import MouseEvent
+
+from downsample import LevelOfDetail, min_max
+
+
+def test_min_max_keeps_extremes():
+    x = np.arange(10000)
+    y = np.sin(x / 50.0)
+    y[1234] = 50.0
+    y[8765] = -50.0
+    rx, ry = min_max(x, y, 500)
+    assert len(rx) <= 1002
+    assert np.all(np.diff(rx) > 0)
+    assert ry.max() == 50.0 and ry.min() == -50.0
+
+
+def test_min_max_ignores_nan_but_keeps_gaps():
+    x = np.arange(10000)
+    y = np.random.default_rng(0).random(10000)
+    y[::2] = np.nan
+    y[4321] = 50.0
+    rx, ry = min_max(x, y, 500)
+    assert np.nanmax(ry) == 50.0
+    assert np.nanmin(ry) == np.nanmin(y)
+    # One NaN separator per bucket with a gap, not a NaN in place of its max
+    assert np.isnan(ry).sum() <= 500
+    assert (~np.isnan(ry)).sum() >= 2 * 500 - 2
+
+
+def test_min_max_all_nan_bucket_stays_a_gap():
+    x = np.arange(1000)
+    y = np.ones(1000)
+    y[400:600] = np.nan
+    rx, ry = min_max(x, y, 50)
+    inside = (rx >= 400) & (rx < 600)
+    assert inside.any() and np.isnan(ry[inside]).all()
+    assert np.all(ry[~np.isnan(ry)] == 1.0)
+
+
+def test_tooltip_only_blits_when_the_hovered_point_changes(monkeypatch):
+    fig, ax = plt.subplots()
+    lod = LevelOfDetail(ax)
+    lod.plot(np.arange(1000.0), np.linspace(0, 1, 1000))
+    lod.enable_tooltips()
+    fig.canvas.draw()
+    blits, redraws = [], []
+    monkeypatch.setattr(fig.canvas, "blit", lambda *args: blits.append(args))
+    monkeypatch.setattr(fig.canvas, "draw_idle", lambda: redraws.append(1))
+
+    x, y = ax.transData.transform((500, 0.5))
+    for _ in range(3):
+        fig.canvas.callbacks.process("motion_notify_event", MouseEvent("motion_notify_event", fig.canvas, x, y))
+    assert len(blits) == 1 and lod.tooltip.get_visible()
+
+    fig.canvas.callbacks.process("motion_notify_event", MouseEvent("motion_notify_event", fig.canvas, 0, 0))
+    assert len(blits) == 2 and not lod.tooltip.get_visible()
+    assert not redraws
+    plt.close(fig)
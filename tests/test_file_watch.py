@@ -0,0 +1,136 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_cache import compact_frame
+from file_watch import FileWatcher, WatchedDataset, append_frame, parse_rows
+
+
+def write(path, text, mode="w"):
+    with open(path, mode, encoding="utf-8", newline="") as f:
+        f.write(text)
+    # Make sure the change is visible even within the filesystem's mtime resolution
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "life.csv"
+    write(path, "Country,Year,Life expectancy\nChad,2000,48.1\nPeru,2000,70.5\n")
+    return str(path)
+
+
+def test_unchanged_file_has_no_change(csv_path):
+    assert FileWatcher(csv_path).check() is None
+
+
+def test_appended_rows(csv_path):
+    watcher = FileWatcher(csv_path)
+    write(csv_path, "Chad,2001,48.9\nPeru,2001,71.0\n", "a")
+    change = watcher.check()
+    assert change.kind == "rows"
+    assert change.data == b"Chad,2001,48.9\nPeru,2001,71.0\n"
+    assert watcher.check() is None
+
+
+def test_partial_last_line_waits_for_its_newline(csv_path):
+    watcher = FileWatcher(csv_path)
+    write(csv_path, "Chad,2001,48", "a")
+    assert watcher.check() is None
+    write(csv_path, ".9\n", "a")
+    assert watcher.check().data == b"Chad,2001,48.9\n"
+
+
+def test_added_columns(csv_path):
+    watcher = FileWatcher(csv_path)
+    write(csv_path, "Country,Year,Life expectancy,GDP\nChad,2000,48.1,\nPeru,2000,70.5,\n")
+    change = watcher.check()
+    assert change.kind == "columns"
+    assert change.columns == ["GDP"]
+
+
+@pytest.mark.parametrize("text", [
+    "Country,Life expectancy\nChad,48.1\n",
+    "Country,Year,Life expectancy\nChad,2000,48.1\n",
+    "Country,Year,Life expectancy\nMali,2000,48.1\nPeru,2000,70.5\nChad,2001,48.9\n",
+])
+def test_rewritten_file_needs_reload(csv_path, text):
+    watcher = FileWatcher(csv_path)
+    write(csv_path, text)
+    assert watcher.check().kind == "reload"
+
+
+def test_change_during_load_forces_reload(csv_path):
+    watcher = FileWatcher(csv_path)
+    write(csv_path, "Chad,2001,48.9\n", "a")
+    watcher.confirm()
+    assert watcher.check().kind == "reload"
+
+
+def test_appended_rows_match_reading_the_whole_file(csv_path):
+    watcher = FileWatcher(csv_path)
+    before = compact_frame(pd.read_csv(csv_path))
+    write(csv_path, "Mali,2001,50.2\nChad,2001,\n", "a")
+    rows = parse_rows(watcher.check().data, watcher.columns())
+    merged = append_frame(before, rows)
+    expected = pd.read_csv(csv_path)
+    assert merged["Country"].astype(str).tolist() == expected["Country"].tolist()
+    assert merged["Year"].tolist() == expected["Year"].tolist()
+    np.testing.assert_allclose(merged["Life expectancy"].to_numpy(dtype=float),
+                               expected["Life expectancy"].to_numpy(), rtol=1e-6)
+
+
+def test_parse_rows_rejects_wrong_field_counts():
+    with pytest.raises(ValueError):
+        parse_rows(b"Chad,2001\n", ["Country", "Year", "Life expectancy"])
+
+
+class Status:
+    def run(self, name, fn, on_done=None, message=""):
+        self.message = message
+        on_done(fn(None))
+
+
+class Widget:
+    def after(self, ms, poll):
+        self.poll = poll
+
+    def winfo_exists(self):
+        return True
+
+
+def test_watched_dataset_merges_and_reloads(csv_path):
+    widget, status, seen = Widget(), Status(), []
+
+    def merge(change, df):
+        if change.kind != "rows":
+            return None
+        return append_frame(df, parse_rows(change.data, dataset.columns()))
+
+    dataset = WatchedDataset(widget, status, "life.csv", lambda: csv_path, pd.read_csv, merge, seen.append).start()
+    first_version = dataset.version
+    assert len(seen[-1]) == 2
+
+    write(csv_path, "Mali,2001,50.2\n", "a")
+    widget.poll()
+    assert len(seen) == 2 and len(seen[-1]) == 3
+    assert dataset.version != first_version
+
+    write(csv_path, "Country,Year,Life expectancy,GDP\nChad,2000,48.1,1\n")
+    widget.poll()
+    assert status.message == "Reloading life.csv..."
+    assert list(seen[-1].columns) == ["Country", "Year", "Life expectancy", "GDP"]
+
+
+def test_unmergeable_rows_fall_back_to_reload(csv_path):
+    widget, status, seen = Widget(), Status(), []
+    merge = lambda change, df: append_frame(df, parse_rows(change.data, ["Country", "Year", "Life expectancy"]))
+    WatchedDataset(widget, status, "life.csv", lambda: csv_path, pd.read_csv, merge, seen.append).start()
+
+    write(csv_path, "Mali,2001\n", "a")
+    widget.poll()
+    assert status.message == "Reloading life.csv..."
+    assert len(seen[-1]) == 3
@@ -0,0 +1,49 @@
+import random
+from itertools import combinations
+
+from comparedatasets import UnionFind, group_datasets
+
+
+def brute_force_groups(datasets, min_shared_columns, min_jaccard):
+    sets = UnionFind(datasets)
+    for a, b in combinations(datasets, 2):
+        shared = len(datasets[a] & datasets[b])
+        union = len(datasets[a] | datasets[b])
+        if shared and shared >= min_shared_columns and shared / union >= min_jaccard:
+            sets.union(a, b)
+    return sets.groups()
+
+
+def normalized(groups):
+    return sorted(sorted(group) for group in groups)
+
+
+def test_matches_brute_force_pairs():
+    rng = random.Random(0)
+    columns = [f"c{i}" for i in range(25)]
+    for _ in range(100):
+        datasets = {f"f{i}.csv": set(rng.sample(columns, rng.randint(0, 6))) for i in range(rng.randint(1, 40))}
+        for min_shared, min_jaccard in [(2, 0.0), (1, 0.0), (3, 0.5), (1, 0.3)]:
+            assert normalized(group_datasets(datasets, min_shared, min_jaccard)) == \
+                normalized(brute_force_groups(datasets, min_shared, min_jaccard))
+
+
+def test_groups_merge_transitively():
+    datasets = {
+        "a.csv": {"country", "year", "gdp"},
+        "b.csv": {"country", "year", "population"},
+        "c.csv": {"population", "density", "area"},
+        "d.csv": {"density", "area", "capital"},
+    }
+    # a-b share two columns, c-d share two; b-c share only one
+    assert normalized(group_datasets(datasets, 2)) == [["a.csv", "b.csv"], ["c.csv", "d.csv"]]
+    assert normalized(group_datasets(datasets, 1)) == [["a.csv", "b.csv", "c.csv", "d.csv"]]
+
+
+def test_shared_column_threshold():
+    datasets = {"a.csv": {"x", "y", "z"}, "b.csv": {"x", "y", "w"}, "c.csv": {"q"}, "d.csv": {"q"}}
+    assert normalized(group_datasets(datasets, 2)) == [["a.csv", "b.csv"]]
+    assert normalized(group_datasets(datasets, 3)) == []
+    # Identical single-column files only group when one shared column is enough
+    assert normalized(group_datasets(datasets, 1)) == [["a.csv", "b.csv"], ["c.csv", "d.csv"]]
+    assert normalized(group_datasets(datasets, 2, min_jaccard=0.6)) == []
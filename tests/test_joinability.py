@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from joinability import KeySketch, find_join_keys, normalize_values
+
+# Bottom-k estimates are within about 1 / sqrt(k) of the truth; allow several times that
+TOLERANCE = 0.2
+
+
+def sketch_of(values, k=256, chunk=None):
+    sketch = KeySketch(k)
+    chunk = chunk or len(values)
+    for start in range(0, len(values), chunk):
+        sketch.update(values[start:start + chunk])
+    return sketch
+
+
+def exact_set(values):
+    return set(normalize_values(values))
+
+
+def test_small_columns_are_counted_exactly():
+    values = [f"id{i}" for i in range(100)] * 3
+    assert sketch_of(values).distinct_count() == 100
+
+
+@pytest.mark.parametrize("distinct", [1000, 20000])
+def test_distinct_count_close_to_exact(distinct):
+    values = np.random.default_rng(distinct).integers(0, distinct, distinct * 3)
+    exact = len(exact_set(values))
+    assert sketch_of(values).distinct_count() == pytest.approx(exact, rel=TOLERANCE)
+
+
+def test_chunked_updates_match_one_pass():
+    values = [f"key{i % 5000}" for i in range(20000)]
+    assert np.array_equal(sketch_of(values, chunk=777).hashes, sketch_of(values).hashes)
+
+
+@pytest.mark.parametrize("overlap", [0.1, 0.5, 0.9])
+def test_jaccard_and_containment_close_to_exact(overlap):
+    n = 10000
+    shared = int(n * overlap)
+    a = [f"v{i}" for i in range(n)]
+    b = [f"v{i}" for i in range(n - shared, 2 * n - shared)]
+    set_a, set_b = exact_set(a), exact_set(b)
+    sketch_a, sketch_b = sketch_of(a), sketch_of(b)
+
+    jaccard = len(set_a & set_b) / len(set_a | set_b)
+    assert sketch_a.jaccard(sketch_b) == pytest.approx(jaccard, abs=TOLERANCE * max(jaccard, 0.1))
+    containment = len(set_a & set_b) / len(set_a)
+    assert sketch_a.containment(sketch_b) == pytest.approx(containment, abs=TOLERANCE * max(containment, 0.1))
+
+
+def test_values_are_normalised_before_hashing():
+    assert sketch_of(["Albania ", "CHAD"]).jaccard(sketch_of(["albania", "chad"])) == 1.0
+    # Whole-number floats (integer columns with gaps) match the integers
+    assert sketch_of(np.array([1960.0, 1961.0, np.nan])).jaccard(sketch_of(["1960", "1961"])) == 1.0
+
+
+def test_find_join_keys_picks_the_shared_column(tmp_path):
+    countries = [f"Country {i}" for i in range(200)]
+    rng = np.random.default_rng(2)
+    left = pd.DataFrame({"Country": countries, "Score": rng.normal(size=200)})
+    right = pd.DataFrame({"Nation": countries[50:] * 2, "Region": [f"R{i % 7}" for i in range(300)]})
+    left.to_csv(tmp_path / "left.csv", index=False)
+    right.to_csv(tmp_path / "right.csv", index=False)
+
+    matches, unmatched = find_join_keys([str(tmp_path / "left.csv"), str(tmp_path / "right.csv")])
+    assert not unmatched
+    best = matches[0]
+    assert best["columns"] == ("Country", "Nation")
+    assert best["containment"] == pytest.approx(1.0, abs=TOLERANCE)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from search_index import SubstringIndex
+
+OPTIONS = ["France", "French Polynesia", "Chad", "Côte d'Ivoire", "Saint Vincent and the Grenadines",
+           "Guinea", "Guinea-Bissau", "Papua New Guinea", "Equatorial Guinea", "Niger", "Nigeria",
+           "United States", "United Kingdom", "Korea, Rep.", "Korea, Dem. People's Rep.", "", 1960]
+
+
+def linear_filter(options, query):
+    return [i for i, option in enumerate(options) if query.lower() in str(option).lower()]
+
+
+@pytest.mark.parametrize("query", ["", "g", "GU", "gui", "guinea", "Guinea-B", "nig", "niger",
+                                   "korea, ", "rep.", "ô", "d'iv", "196", "zzz", "united k"])
+def test_search_matches_linear_filter(query):
+    index = SubstringIndex(OPTIONS)
+    assert index.search(query).tolist() == linear_filter(OPTIONS, query)
+
+
+def test_narrowing_within_previous_result_matches_linear_filter():
+    rng = np.random.default_rng(1)
+    letters = list("abcde ")
+    options = ["".join(rng.choice(letters, rng.integers(0, 12))) for _ in range(2000)]
+    index = SubstringIndex(options)
+    for _ in range(50):
+        query = "".join(rng.choice(letters, 6))
+        result = None
+        for end in range(1, len(query) + 1):
+            result = index.search(query[:end], within=result)
+            assert result.tolist() == linear_filter(options, query[:end])
+
+
+def test_position_of_matches_list_index():
+    options = ["Chad", "Peru", "Chad", "Mali"]
+    index = SubstringIndex(options)
+    assert [index.position_of(option) for option in options] == [options.index(option) for option in options]
+    assert index.position_of("Fiji") is None
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from spatial import CityGrid, build_city_grid, haversine_km
+
+
+@pytest.fixture(scope="module")
+def cities():
+    rng = np.random.default_rng(3)
+    n = 3000
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lng = rng.uniform(-180, 180, n)
+    # Clusters near the poles and on both sides of the date line
+    lat[:50], lng[:50] = rng.uniform(85, 90, 50), rng.uniform(-180, 180, 50)
+    lat[50:100], lng[50:100] = rng.uniform(-10, 10, 50), rng.choice([-179.9, 179.9], 50)
+    aqi = rng.integers(0, 500, n).astype(float)
+    aqi[::13] = np.nan
+    lat[7], lng[9] = np.nan, np.nan
+    return pd.DataFrame({"Country": "X", "City": [f"City {i}" for i in range(n)],
+                         "lat": lat, "lng": lng, "AQI Value": aqi})
+
+
+@pytest.fixture(scope="module")
+def grid(cities):
+    return build_city_grid(cities)
+
+
+def located(cities):
+    return cities.dropna(subset=["lat", "lng"])
+
+
+QUERIES = [(0, 0), (48.85, 2.35), (-33.9, 151.2), (89.5, 10), (-89.9, -120), (0, 179.95), (5, -179.95)]
+
+
+@pytest.mark.parametrize("lat, lng", QUERIES)
+@pytest.mark.parametrize("radius_km", [50, 500, 3000])
+def test_within_radius_matches_brute_force(grid, cities, lat, lng, radius_km):
+    known = located(cities)
+    distances = haversine_km(lat, lng, known["lat"].to_numpy(), known["lng"].to_numpy())
+    expected = set(known["City"][distances <= radius_km])
+
+    indices, found = grid.within_radius(lat, lng, radius_km)
+    assert set(grid.labels["City"].iloc[indices]) == expected
+    assert np.all(np.diff(found) >= 0)
+
+
+@pytest.mark.parametrize("lat, lng", QUERIES)
+def test_nearest_matches_brute_force(grid, cities, lat, lng):
+    known = located(cities)
+    distances = np.sort(haversine_km(lat, lng, known["lat"].to_numpy(), known["lng"].to_numpy()))
+    _, found = grid.nearest(lat, lng, k=5)
+    np.testing.assert_allclose(found, distances[:5])
+
+
+@pytest.mark.parametrize("box", [(-90, 90, -180, 180), (10.5, 40.2, -20.3, 60.7), (-5, 5, -5, 5), (84, 90, -180, 0)])
+def test_bbox_aggregate_matches_brute_force(grid, cities, box):
+    lat_min, lat_max, lng_min, lng_max = box
+    known = located(cities)
+    inside = known[known["lat"].between(lat_min, lat_max) & known["lng"].between(lng_min, lng_max)]
+    values = inside["AQI Value"].dropna()
+
+    result = grid.bbox_aggregate("AQI Value", *box)
+    assert result["count"] == len(values)
+    assert result["mean"] == pytest.approx(values.mean())
+    assert result["min"] == values.min() and result["max"] == values.max()
+
+
+def test_empty_box_has_no_values():
+    grid = CityGrid([10.0], [10.0], {"v": [1.0]}, pd.DataFrame({"City": ["A"]}))
+    assert grid.bbox_aggregate("v", -50, -40, 0, 5)["count"] == 0
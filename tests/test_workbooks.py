@@ -0,0 +1,42 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+import dataset_cache
+from workbooks import load_sheet
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    from openpyxl import Workbook
+
+    monkeypatch.setattr(dataset_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    book = Workbook()
+    sheet = book.active
+    sheet.title = "Data"
+    sheet.append(["Country", "Code", "Year", "Opened"])
+    sheet.append(["France", 250, 2000, datetime.datetime(2000, 1, 1)])
+    sheet.append(["Kosovo", "XKX", 2001, datetime.datetime(2001, 6, 30)])
+    sheet.append(["Chad", None, 2002, None])
+    path = tmp_path / "book.xlsx"
+    book.save(path)
+    return str(path)
+
+
+def test_load_sheet_matches_read_excel(workbook):
+    expected = pd.read_excel(workbook, sheet_name="Data")
+    first = load_sheet(workbook, "Data")
+    cached = load_sheet(workbook, "Data")
+    for df in (first, cached):
+        assert list(df.columns) == list(expected.columns)
+        assert df["Year"].tolist() == expected["Year"].tolist()
+        assert df["Opened"].tolist()[:2] == expected["Opened"].tolist()[:2]
+        assert df["Country"].tolist() == expected["Country"].tolist()
+
+
+def test_mixed_column_keeps_python_types_when_cached(workbook):
+    first = load_sheet(workbook, "Data", columns=["Country", "Code"])
+    cached = load_sheet(workbook, "Data", columns=["Country", "Code"])
+    assert cached["Code"].dtype == object
+    assert cached["Code"].tolist() == first["Code"].tolist() == [250, "XKX", None]
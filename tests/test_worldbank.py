@@ -0,0 +1,73 @@
+import csv
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset_cache
+from worldbank import load_wide, wide_from_frame
+
+
+def naive_load(path):
+    """The row-by-row dict of dicts the wide loader replaced."""
+    data = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        for row in reader:
+            data[row[0]] = {}
+            for column, value in zip(header[2:], row[2:]):
+                try:
+                    data[row[0]][int(column)] = float(value)
+                except ValueError:
+                    pass
+    return data
+
+
+@pytest.fixture
+def wide_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    rng = np.random.default_rng(4)
+    years = list(range(1960, 1990))
+    lines = ["Country Name,Country Code," + ",".join(map(str, years))]
+    for i in range(120):
+        values = [f"{value:.6g}" for value in rng.normal(1e6, 1e5, len(years))]
+        for j in rng.choice(len(years), 5, replace=False):
+            values[j] = rng.choice(["..", ""])
+        lines.append(f"Country {i},C{i:02d}," + ",".join(values))
+    # A duplicated country keeps its last row, as the dict did
+    lines.append("Country 3,C03," + ",".join(["1"] * len(years)))
+    path = tmp_path / "wide.csv"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_load_wide_matches_naive_loader(wide_path):
+    expected = naive_load(wide_path)
+    table = load_wide(wide_path)
+    assert set(table.countries) == set(expected)
+    for country, by_year in expected.items():
+        years, values = table.series(country)
+        assert years.tolist() == sorted(by_year)
+        np.testing.assert_allclose(values, [by_year[year] for year in years.tolist()])
+
+
+def test_rows_are_contiguous_views(wide_path):
+    table = load_wide(wide_path)
+    row = table.row("Country 5")
+    assert row.base is not None and row.flags["C_CONTIGUOUS"]
+
+
+def test_with_rows_and_years_match_a_full_load(wide_path):
+    full = pd.read_csv(wide_path, na_values=[".."])
+    years = [col for col in full.columns if col.isdigit()]
+    early = wide_from_frame(full.iloc[:60, :-10])
+    late_rows = wide_from_frame(full.iloc[60:, :-10])
+    merged = early.with_rows(late_rows)
+    added = wide_from_frame(full[["Country Name", "Country Code", *years[-10:]]])
+    merged = merged.with_years(added.years, added.values)
+
+    expected = wide_from_frame(full)
+    assert merged.countries.tolist() == expected.countries.tolist()
+    assert merged.years.tolist() == expected.years.tolist()
+    np.testing.assert_array_equal(merged.values, expected.values)
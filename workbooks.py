@@ -0,0 +1,138 @@
+import json
+
+import pandas as pd
+
+from dataset_cache import cache_dir_for, read_cached_frame, source_signature, write_cached_frame
+from schemas import header_names
+
+# Rows turned into a DataFrame at a time while streaming a sheet
+CHUNK_ROWS = 10000
+
+
+def open_workbook(path):
+    # Read-only mode streams rows from the XML instead of building every cell object
+    from openpyxl import load_workbook
+    return load_workbook(path, read_only=True, data_only=True)
+
+
+def sheet_columns(path):
+    """Column names of every sheet, read from first rows only, in workbook order."""
+    workbook = open_workbook(path)
+    try:
+        return {
+            sheet.title: header_names(next(sheet.iter_rows(max_row=1, values_only=True), ()))
+            for sheet in workbook.worksheets
+        }
+    finally:
+        workbook.close()
+
+
+def iter_sheet_chunks(path, sheet=None, columns=None, chunk_rows=CHUNK_ROWS, job=None):
+    """Stream a sheet (the first by default) as DataFrames of up to ``chunk_rows`` rows.
+
+    Only ``columns`` (all if None) are kept. Blank rows at the end of the
+    sheet are dropped, as ``pd.read_excel`` does.
+    """
+    workbook = open_workbook(path)
+    try:
+        worksheet = workbook.worksheets[0] if sheet is None else workbook[sheet]
+        rows = worksheet.iter_rows(values_only=True)
+        header = header_names(next(rows, ()))
+        names = header if columns is None else list(columns)
+        missing = [name for name in names if name not in header]
+        if missing:
+            raise ValueError(f"Columns not in sheet: {', '.join(missing)}")
+        positions = [header.index(name) for name in names]
+        total = worksheet.max_row
+
+        chunk, blank, done = [], 0, 1
+        for row in rows:
+            values = tuple(row[i] if i < len(row) else None for i in positions)
+            if all(value is None for value in values):
+                # Only kept if a non-blank row follows
+                blank += 1
+                continue
+            chunk.extend([(None,) * len(names)] * blank)
+            blank = 0
+            chunk.append(values)
+            if len(chunk) >= chunk_rows:
+                done += len(chunk)
+                yield pd.DataFrame.from_records(chunk, columns=names)
+                chunk = []
+                if job is not None:
+                    job.report(min(done / total, 1.0) if total else None, f"{done:,} rows read")
+        if chunk or done == 1:
+            yield pd.DataFrame.from_records(chunk, columns=names)
+    finally:
+        workbook.close()
+
+
+def load_sheet(path, sheet=None, columns=None, job=None):
+    """Load one sheet of an .xlsx workbook through the binary dataset cache.
+
+    The first open streams the sheet with ``iter_sheet_chunks`` and stores
+    the result like a converted CSV, keyed by workbook, sheet and columns;
+    reopening it memory-maps the stored columns instead of parsing XML.
+    """
+    variant = json.dumps({"_sheet": sheet, "_columns": columns}, sort_keys=True, default=str)
+    signature = source_signature(path)
+    target = cache_dir_for(path, variant)
+
+    df = read_cached_frame(target, signature, variant)
+    if df is None:
+        chunks = list(iter_sheet_chunks(path, sheet, columns, job=job))
+        # Per-chunk dtypes are merged by concat; columns that are still object are narrowed here
+        df = pd.concat(chunks, ignore_index=True).infer_objects()
+        write_cached_frame(target, signature, variant, df)
+    return df
+
+
+def ask_sheet_and_columns(parent, path):
+    """Let the user pick a sheet and the columns to load.
+
+    Returns ``(sheet, columns)``, with columns None when all are wanted,
+    or None if the dialog was cancelled.
+    """
+    import tkinter as tk
+    from tkinter import ttk
+
+    sheets = sheet_columns(path)
+    result = []
+
+    dialog = tk.Toplevel(parent)
+    dialog.title("Load Workbook")
+    dialog.geometry("360x420")
+    dialog.transient(parent)
+
+    ttk.Label(dialog, text="Sheet:").pack(anchor="w", padx=10, pady=(10, 0))
+    sheet_var = tk.StringVar(value=next(iter(sheets), ""))
+    sheet_combo = ttk.Combobox(dialog, textvariable=sheet_var, values=list(sheets), state="readonly")
+    sheet_combo.pack(fill="x", padx=10)
+
+    ttk.Label(dialog, text="Columns:").pack(anchor="w", padx=10, pady=(10, 0))
+    column_list = tk.Listbox(dialog, selectmode="extended", exportselection=False)
+    column_list.pack(fill="both", expand=True, padx=10)
+
+    def show_columns(event=None):
+        column_list.delete(0, tk.END)
+        column_list.insert(tk.END, *sheets.get(sheet_var.get(), []))
+        column_list.selection_set(0, tk.END)
+
+    def accept():
+        names = sheets.get(sheet_var.get(), [])
+        chosen = [column_list.get(i) for i in column_list.curselection()]
+        if chosen:
+            result.append((sheet_var.get(), None if len(chosen) == len(names) else chosen))
+            dialog.destroy()
+
+    sheet_combo.bind("<<ComboboxSelected>>", show_columns)
+    show_columns()
+
+    buttons = ttk.Frame(dialog)
+    buttons.pack(fill="x", padx=10, pady=10)
+    ttk.Button(buttons, text="Cancel", command=dialog.destroy).pack(side="right")
+    ttk.Button(buttons, text="Load", command=accept).pack(side="right", padx=5)
+
+    dialog.grab_set()
+    dialog.wait_window()
+    return result[0] if result else None
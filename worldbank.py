@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from dataset_cache import load_csv
+
+# World Bank exports mark missing values with ".."
+MISSING_MARKERS = [".."]
+
+
+class WideTable:
+    """Countries x years matrix from a World Bank style wide CSV.
+
+    ``values[i, j]`` is the value for ``countries[i]`` in ``years[j]``, NaN if
+    missing. Each row is a contiguous view of one country's series.
+    """
+
+    def __init__(self, countries, codes, years, values):
+        self.countries = countries
+        self.codes = codes
+        self.years = years
+        self.values = values
+        # Later duplicates win, as they did with the old dict-of-dicts
+        self.row_of = {country: i for i, country in enumerate(countries)}
+
+    def __len__(self):
+        return len(self.countries)
+
+    def __contains__(self, country):
+        return country in self.row_of
+
+    def row(self, country):
+        return self.values[self.row_of[country]]
+
+    def series(self, country):
+        """Years and values for one country, skipping missing years."""
+        row = self.row(country)
+        present = ~np.isnan(row)
+        return self.years[present], row[present]
+
+    def with_rows(self, other):
+        """A table with ``other``'s countries added below; both must have the same years."""
+        return WideTable(
+            countries=np.concatenate([self.countries, other.countries]),
+            codes=np.concatenate([self.codes, other.codes]),
+            years=self.years,
+            values=np.concatenate([self.values, other.values]),
+        )
+
+    def with_years(self, years, values):
+        """A table with extra year columns; ``values`` has one row per country."""
+        all_years = np.concatenate([self.years, years])
+        order = np.argsort(all_years, kind="stable")
+        return WideTable(self.countries, self.codes, all_years[order],
+                         np.ascontiguousarray(np.hstack([self.values, values])[:, order]))
+
+
+def load_wide(path):
+    """Parse a "Country Name, Country Code, <year>..." file into a WideTable."""
+    return wide_from_frame(load_csv(path, na_values=MISSING_MARKERS))
+
+
+def key_columns(columns):
+    """The (country name, country code) columns of a wide file's header."""
+    normalized = [str(col).strip().lower().replace(" ", "_") for col in columns]
+    name_col = columns[normalized.index("country_name")] if "country_name" in normalized else columns[0]
+    code_col = columns[normalized.index("country_code")] if "country_code" in normalized else columns[1]
+    return name_col, code_col
+
+
+def wide_from_frame(df):
+    name_col, code_col = key_columns(list(df.columns))
+    year_cols = [col for col in df.columns if str(col).strip().isdigit()]
+
+    block = df[year_cols]
+    if any(block[col].dtype.kind not in "biuf" for col in year_cols):
+        # Stray text in a year column becomes NaN instead of failing the load
+        block = block.apply(pd.to_numeric, errors="coerce")
+
+    return WideTable(
+        countries=df[name_col].to_numpy(dtype=object),
+        codes=df[code_col].to_numpy(dtype=object),
+        years=np.array([int(str(col).strip()) for col in year_cols]),
+        values=np.ascontiguousarray(block.to_numpy(dtype=float)),
+    )